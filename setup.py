@@ -19,6 +19,9 @@ setup(
         'requests',
         'httpx'
     ],
+    extras_require={        # Optional dependencies, installed with e.g. pip install snaptranslate[pdf]
+        'pdf': ['pypdfium2'],
+    },
     classifiers=[          # A list of classifiers that describe the project. This helps users find it on PyPI
         'Development Status :: 3 - Alpha', # Indicates the current development stage
         'Intended Audience :: Developers', # Who is the target audience for this package?
@@ -28,7 +31,9 @@ setup(
     ],
     entry_points={          # Defines any command-line scripts that should be created when package is installed
         'console_scripts': [
-            'snaptranslate=src.main:main' # Creates a command 'snaptranslate' that runs the 'main' function in 'src/main.py'
+            'snaptranslate=src.main:main', # Creates a command 'snaptranslate' that runs the 'main' function in 'src/main.py'
+            'snaptranslate-server=src.core.server:main', # Creates a command 'snaptranslate-server' that runs the HTTP server in 'src/core/server.py'
+            'snaptranslate-document=src.core.documents:main' # Creates a command 'snaptranslate-document' that translates multi-page documents
         ],
     },
     include_package_data=True, # Tells setuptools to include any data files specified in MANIFEST.in (if you have one)
@@ -0,0 +1,195 @@
+# src/core/documents.py
+
+"""
+This module contains the input layer for whole documents: multi-page TIFF files, PDF files and
+sequences of images. Pages are read one at a time and run through OCR and translation in a
+pipeline with a bounded number of pages in flight, so memory use stays flat however long the
+document is.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from . import processing
+from . import translator
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+
+# Configure logging to display any potential errors or warnings
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp'}
+
+def _natural_sort_key(path: str):
+    """
+    Sorts 'page2.png' before 'page10.png'.
+    """
+
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', os.path.basename(path))]
+
+def iter_image_frames(path: str):
+    """
+    Yields the frames of an image file one at a time (every page of a multi-page TIFF, or the
+    single image of other formats). Only the current frame is decoded.
+
+    Yields:
+        RGB PIL Image objects, independent of the open file.
+    """
+
+    with Image.open(path) as document:
+        for index in range(getattr(document, 'n_frames', 1)):
+            document.seek(index)
+            yield document.convert('RGB')    # A decoded copy of this frame only
+
+def iter_pdf_pages(path: str, dpi: int = 300):
+    """
+    Rasterizes the pages of a PDF file one at a time. Requires the optional pypdfium2 package.
+
+    Yields:
+        RGB PIL Image objects rendered at the given resolution.
+    """
+
+    try:
+        import pypdfium2
+    except ImportError:
+        raise ImportError("Reading PDF files requires the pypdfium2 package. Install it with: pip install pypdfium2")
+
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                yield page.render(scale=dpi / 72).to_pil().convert('RGB')
+            finally:
+                page.close()
+    finally:
+        pdf.close()
+
+def iter_pages(source, dpi: int = 300):
+    """
+    Streams the pages of a document, one page in memory at a time.
+
+    Args:
+        source: A multi-page TIFF (or any image file), a PDF file, a directory of images, or a list
+                of image paths. Directory contents are read in natural order ('2' before '10').
+        dpi: Resolution PDF pages are rendered at. Defaults to 300.
+
+    Yields:
+        Tuples (page_number, image), with page numbers starting at 1.
+    """
+
+    if isinstance(source, (list, tuple)):
+        paths = list(source)
+    elif os.path.isdir(source):
+        paths = sorted((os.path.join(source, name) for name in os.listdir(source)
+                        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS), key=_natural_sort_key)
+    else:
+        paths = [source]
+
+    page_number = 0
+    for path in paths:
+        frames = iter_pdf_pages(path, dpi) if path.lower().endswith('.pdf') else iter_image_frames(path)
+
+        for image in frames:
+            page_number += 1
+            yield page_number, image
+
+async def process_document(source, target_language: str = 'en', source_language: str = None, executor=None,
+                           max_pages_in_flight: int = 4, dpi: int = 300):
+    """
+    Runs every page of a document through OCR and translation. Reading, OCR and translation of
+    different pages overlap, with at most max_pages_in_flight pages held in memory.
+
+    Args:
+        source: The document, as accepted by iter_pages.
+        target_language: The ISO 639-1 code of the target language for translation.
+                         Defaults to 'en' (English).
+        source_language: The ISO 639-1 code of the source language.
+                         Defaults to None, allowing the translator to potentially auto-detect the language.
+        executor: An optional concurrent.futures.Executor or shared_images.SharedMemoryOcrPool to run
+                  OCR in. Defaults to None, in which case a thread pool is created for the document.
+        max_pages_in_flight: The maximum number of pages read but not yet fully processed.
+        dpi: Resolution PDF pages are rendered at. Defaults to 300.
+
+    Yields:
+        Tuples (page_number, ProcessingResult), in page order.
+    """
+
+    loop = asyncio.get_running_loop()
+    owned_executor = None
+    if executor is None:
+        executor = owned_executor = ThreadPoolExecutor(max_workers=max_pages_in_flight, thread_name_prefix='document')
+
+    # Pages are read in a thread: the page generator cannot be sent to worker processes
+    page_reader = executor if isinstance(executor, ThreadPoolExecutor) else None
+
+    pages = iter_pages(source, dpi)
+    slots = asyncio.Semaphore(max_pages_in_flight)
+    tasks = deque()    # Pages being processed, in page order
+
+    async def process_page(page_number: int, image: Image.Image):
+        """
+        OCRs and translates one page, then frees its slot.
+        """
+
+        try:
+            return page_number, await processing.process_image(image, target_language=target_language,
+                                                               source_language=source_language, executor=executor)
+        finally:
+            slots.release()
+
+    try:
+        async with translator.translation_session():
+            while True:
+                await slots.acquire()   # Wait for room before reading the next page
+
+                # Read (decode or rasterize) the next page off the event loop
+                page = await loop.run_in_executor(page_reader, next, pages, None)
+                if page is None:
+                    slots.release()
+                    break
+
+                tasks.append(asyncio.create_task(process_page(*page)))
+                del page    # Only the task keeps the image alive
+
+                # Hand out the pages that are done, in order, without holding up reading ahead
+                while tasks and tasks[0].done():
+                    yield tasks.popleft().result()
+
+            while tasks:
+                yield await tasks.popleft()
+
+    finally:
+        # The caller stopped early or an error occurred, do not leave work running
+        for task in tasks:
+            task.cancel()
+        pages.close()
+
+        if owned_executor is not None:
+            owned_executor.shutdown(wait=False, cancel_futures=True)
+
+def main():
+    """
+    Translates a document from the command line, printing each page as soon as it is done.
+    """
+
+    parser = argparse.ArgumentParser(description="OCR and translate a multi-page document page by page.")
+    parser.add_argument('source', help="A multi-page TIFF, a PDF, or a directory of images.")
+    parser.add_argument('--target', default='en', help="Target language code. Defaults to 'en'.")
+    parser.add_argument('--source-language', default=None, help="Source language code. Detected automatically if omitted.")
+    parser.add_argument('--dpi', type=int, default=300, help="Resolution PDF pages are rendered at.")
+    args = parser.parse_args()
+
+    async def run():
+        async for page_number, result in process_document(args.source, target_language=args.target,
+                                                          source_language=args.source_language, dpi=args.dpi):
+            print(f"--- Page {page_number} ---\n{result.translated_text}\n", flush=True)
+
+    asyncio.run(run())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+# src/core/glossary.py
+
+"""
+This module contains a local glossary consulted before the translation service. Short strings
+(single words, labels) found in the glossary are answered instantly and offline, and glossary
+terms inside longer texts are kept consistent with the user's terminology.
+
+Glossaries are user-supplied TSV files named after their language pair, e.g. 'ru-en.tsv', with
+one 'source<TAB>target' entry per line. Each file is compiled once into a sorted binary index
+next to it ('ru-en.tsv.idx') which is memory-mapped, so even large glossaries cost almost no
+memory and load instantly.
+"""
+
+import configparser
+import logging
+import mmap
+import os
+import re
+import struct
+
+# Configure logging to display any potential errors or warnings
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MAGIC = b'SNAPGLS1'
+HEADER = struct.Struct('<8sII')     # Magic, number of entries, longest source term in words
+ENTRY = struct.Struct('<IIII')      # Key offset, key length, value offset, value length (into the data section)
+WORD_PATTERN = re.compile(r'\w+')
+PLACEHOLDER_PATTERN = re.compile(r'\{(\d+)\}')
+
+def get_glossary_directory():    # Find the glossary directory from config.ini file
+    config = configparser.ConfigParser()
+    config.read('config.ini')  # Assuming config.ini is in the root directory
+
+    if 'Glossary' in config and not config['Glossary'].getboolean('ENABLED', True):
+        return None
+
+    return config.get('Glossary', 'DIRECTORY', fallback='glossaries')
+
+def normalize_term(text: str) -> str:
+    """
+    Returns the form used to look terms up: lowercase, whitespace collapsed, and without
+    surrounding punctuation such as a trailing colon on a label.
+    """
+
+    return " ".join(text.casefold().split()).strip(" .,:;!?\"'«»()[]")
+
+def compile_glossary(tsv_path: str, index_path: str) -> int:
+    """
+    Compiles a TSV glossary into a sorted binary index.
+
+    Args:
+        tsv_path: Path of the TSV file. Empty lines and lines starting with '#' are ignored.
+                  When a term appears twice, the later entry wins.
+        index_path: Path of the index file to write.
+
+    Returns:
+        The number of entries written.
+    """
+
+    entries = {}
+    with open(tsv_path, encoding='utf-8') as tsv_file:
+        for line_number, line in enumerate(tsv_file, start=1):
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+
+            parts = line.split('\t')
+            if len(parts) < 2 or not normalize_term(parts[0]) or not parts[1].strip():
+                logging.warning(f"Skipping malformed glossary entry in {tsv_path}, line {line_number}: '{line}'")
+                continue
+
+            entries[normalize_term(parts[0]).encode('utf-8')] = parts[1].strip().encode('utf-8')
+
+    keys = sorted(entries)  # Byte order, the order used by the binary search
+    max_words = max((len(key.decode('utf-8').split()) for key in keys), default=0)
+
+    table, data = [], bytearray()
+    for key in keys:
+        value = entries[key]
+        table.append(ENTRY.pack(len(data), len(key), len(data) + len(key), len(value)))
+        data += key + value
+
+    # Write to a temporary file first so that a reader never sees a half-written index
+    temporary_path = index_path + '.tmp'
+    with open(temporary_path, 'wb') as index_file:
+        index_file.write(HEADER.pack(MAGIC, len(keys), max_words))
+        index_file.write(b''.join(table))
+        index_file.write(data)
+    os.replace(temporary_path, index_path)
+
+    return len(keys)
+
+class Glossary:
+    """
+    A read-only glossary backed by a memory-mapped index built by compile_glossary.
+    Lookups are a binary search over the sorted terms.
+    """
+
+    def __init__(self, index_path: str):
+        """
+        Opens a compiled glossary index.
+
+        Raises ValueError if the file is not a glossary index.
+        """
+
+        with open(index_path, 'rb') as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, self.max_words = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{index_path} is not a SnapTranslate glossary index.")
+
+        self._data_start = HEADER.size + self.count * ENTRY.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, index: int):
+        """
+        Returns (key offset, key length, value offset, value length) of the entry at the given position.
+        """
+
+        return ENTRY.unpack_from(self._map, HEADER.size + index * ENTRY.size)
+
+    def lookup(self, term: str):
+        """
+        Returns the glossary translation of a term, or None if the term is not in the glossary.
+        """
+
+        key = normalize_term(term).encode('utf-8')
+        if not key:
+            return None
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, value_offset, value_length = self._entry(middle)
+            start = self._data_start + key_offset
+            candidate = self._map[start:start + key_length]
+
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                start = self._data_start + value_offset
+                return self._map[start:start + value_length].decode('utf-8')
+
+        return None
+
+    def find_terms(self, text: str) -> list:
+        """
+        Finds glossary terms in a text, preferring the longest term at each position.
+
+        Returns:
+            A list of (start, end, translation) spans, in order and without overlaps.
+        """
+
+        words = list(WORD_PATTERN.finditer(text))
+        spans = []
+        index = 0
+
+        while index < len(words):
+            for length in range(min(self.max_words, len(words) - index), 0, -1):
+                start, end = words[index].start(), words[index + length - 1].end()
+                translation = self.lookup(text[start:end])
+
+                if translation is not None:
+                    spans.append((start, end, translation))
+                    index += length
+                    break
+            else:
+                index += 1
+
+        return spans
+
+    def close(self):
+        """
+        Unmaps the index.
+        """
+
+        self._map.close()
+
+def protect_terms(text: str, glossary: Glossary):
+    """
+    Replaces the glossary terms in a text with numbered placeholders ('{0}', '{1}', ...) that the
+    translation service leaves alone, so that they can be replaced by the glossary translations.
+
+    Returns:
+        A tuple (protected_text, translations), where translations[n] replaces placeholder n.
+        The text is returned unchanged, with no translations, if it has no terms or already contains braces.
+    """
+
+    if '{' in text or '}' in text:
+        return text, []
+
+    spans = glossary.find_terms(text)
+    if not spans:
+        return text, []
+
+    pieces, translations, position = [], [], 0
+    for start, end, translation in spans:
+        pieces.append(text[position:start])
+        pieces.append(f"{{{len(translations)}}}")
+        translations.append(translation)
+        position = end
+    pieces.append(text[position:])
+
+    return "".join(pieces), translations
+
+def restore_terms(translated_text: str, translations: list):
+    """
+    Replaces the placeholders in a translated text with the glossary translations.
+
+    Returns:
+        The restored text, or None if the translation lost or invented a placeholder.
+    """
+
+    found = [int(number) for number in PLACEHOLDER_PATTERN.findall(translated_text)]
+    if sorted(found) != list(range(len(translations))):
+        return None
+
+    return PLACEHOLDER_PATTERN.sub(lambda match: translations[int(match.group(1))], translated_text)
+
+def load_glossaries(directory: str) -> dict:
+    """
+    Loads every '<source>-<target>.tsv' glossary in a directory, compiling those whose index is
+    missing or older than the TSV file.
+
+    Returns:
+        A dictionary mapping (source language, target language) to a Glossary. Empty if the
+        directory does not exist.
+    """
+
+    glossaries = {}
+    if not directory or not os.path.isdir(directory):
+        return glossaries
+
+    for file_name in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(file_name)
+        if extension.lower() != '.tsv' or name.count('-') != 1:
+            continue
+
+        source_language, target_language = name.lower().split('-')
+        tsv_path = os.path.join(directory, file_name)
+        index_path = tsv_path + '.idx'
+
+        try:
+            if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(tsv_path):
+                count = compile_glossary(tsv_path, index_path)
+                logging.info(f"Compiled glossary {file_name} with {count} entries.")
+
+            glossaries[(source_language, target_language)] = Glossary(index_path)
+
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            logging.error(f"Could not load glossary {file_name}: {e}")
+
+    return glossaries
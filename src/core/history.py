@@ -0,0 +1,390 @@
+# src/core/history.py
+
+"""
+This module contains a local history of captures: the recognized and translated text with a
+compressed thumbnail of each capture, stored in SQLite with full-text search (FTS5).
+
+Writes happen on a background thread so that the GUI never waits for the disk.
+"""
+
+from dataclasses import dataclass
+from PIL import Image
+
+import configparser
+import hashlib
+import io
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Configure logging to display any potential errors or warnings
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    image_hash TEXT NOT NULL,
+    source_language TEXT,
+    target_language TEXT,
+    source_text TEXT NOT NULL,
+    translated_text TEXT NOT NULL,
+    size INTEGER NOT NULL           -- Bytes of text, used to estimate how many captures to remove when the history is too large
+);
+CREATE INDEX IF NOT EXISTS captures_image_hash ON captures (image_hash);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    image_hash TEXT PRIMARY KEY,    -- One thumbnail per captured image, shared by its translations into several languages
+    thumbnail BLOB NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS captures_fts USING fts5 (
+    source_text, translated_text, content='captures', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS captures_after_insert AFTER INSERT ON captures BEGIN
+    INSERT INTO captures_fts (rowid, source_text, translated_text) VALUES (new.id, new.source_text, new.translated_text);
+END;
+CREATE TRIGGER IF NOT EXISTS captures_after_delete AFTER DELETE ON captures BEGIN
+    INSERT INTO captures_fts (captures_fts, rowid, source_text, translated_text) VALUES ('delete', old.id, old.source_text, old.translated_text);
+END;
+"""
+
+ENTRY_COLUMNS = "id, created_at, image_hash, source_language, target_language, source_text, translated_text"
+
+@dataclass
+class HistoryConfig:
+    """
+    Settings of the capture history.
+    """
+
+    enabled: bool = True
+    path: str = 'history.db'
+    max_size_mb: float = 100.0      # Oldest captures are removed when the history files grow larger on disk
+    thumbnail_size: int = 320       # Longest side of the stored thumbnails, in pixels
+    thumbnail_quality: int = 70     # JPEG quality of the stored thumbnails (1-95)
+
+@dataclass
+class HistoryEntry:
+    """
+    One stored capture. The thumbnail is loaded separately with HistoryStore.get_thumbnail.
+    """
+
+    id: int
+    created_at: float
+    image_hash: str
+    source_language: str
+    target_language: str
+    source_text: str
+    translated_text: str
+
+def load_history_config(config_path: str = 'config.ini', section: str = 'History') -> HistoryConfig:
+    """
+    Reads a HistoryConfig from the given section of config.ini.
+
+    Args:
+        config_path: Path of the configuration file. Defaults to 'config.ini' in the working directory.
+        section: Name of the section holding the settings. Defaults to 'History'.
+
+    Returns:
+        A HistoryConfig. Settings missing from the file keep their default values.
+    """
+
+    history_config = HistoryConfig()
+    config = configparser.ConfigParser()
+    config.read(config_path)
+
+    if section not in config:
+        return history_config
+
+    options = config[section]
+    try:
+        history_config.enabled = options.getboolean('ENABLED', history_config.enabled)
+        history_config.path = options.get('PATH', history_config.path)
+        history_config.max_size_mb = options.getfloat('MAX_SIZE_MB', history_config.max_size_mb)
+        history_config.thumbnail_size = options.getint('THUMBNAIL_SIZE', history_config.thumbnail_size)
+        history_config.thumbnail_quality = options.getint('THUMBNAIL_QUALITY', history_config.thumbnail_quality)
+    except ValueError as e:
+        logging.warning(f"Invalid value in the [{section}] section of {config_path}: {e}. Using defaults for the rest.")
+
+    return history_config
+
+def hash_image(image: Image.Image) -> str:
+    """
+    Returns a hash of the pixels of an image, used to recognize repeated captures.
+
+    The image is hashed in grayscale at half its size, which is several times faster than hashing
+    every pixel of a large screenshot and still changes with any glyph that differs.
+    """
+
+    digest = hashlib.sha256(f"{image.width}x{image.height}:".encode('ascii'))
+    digest.update(image.convert('L').reduce(2).tobytes())
+
+    return digest.hexdigest()
+
+def make_thumbnail(image: Image.Image, size: int = 320, quality: int = 70) -> bytes:
+    """
+    Returns a JPEG thumbnail of the image whose longest side is at most size pixels.
+    """
+
+    thumbnail = image.convert('RGB')    # JPEG has no alpha channel
+    thumbnail.thumbnail((size, size))
+
+    thumbnail_bytes = io.BytesIO()
+    thumbnail.save(thumbnail_bytes, format='JPEG', quality=quality, optimize=True)
+
+    return thumbnail_bytes.getvalue()
+
+def build_match_query(text: str) -> str:
+    """
+    Turns free text typed by the user into an FTS5 query that matches entries containing every
+    word, the last one as a prefix (so results update while typing). FTS5 syntax is escaped.
+
+    Returns:
+        The query, or an empty string if the text has no words.
+    """
+
+    words = text.split()
+    if not words:
+        return ""
+
+    terms = ['"' + word.replace('"', '""') + '"' for word in words]
+    terms[-1] += '*'
+
+    return " ".join(terms)
+
+class HistoryStore:
+    """
+    A bounded, searchable history of captures in a SQLite database.
+
+    add() only queues the capture; hashing, thumbnailing and writing happen on a background
+    writer thread. Reads (search, recent, find_by_image, get_thumbnail) use a connection of the
+    calling thread and can run while the writer is busy. A capture translated into several
+    languages is stored once per language, with a single thumbnail.
+    """
+
+    def __init__(self, config: HistoryConfig = None):
+        """
+        Initializes the HistoryStore and creates the database if needed.
+
+        Args:
+            config: The HistoryConfig to use. Defaults to the [History] section of config.ini.
+        """
+
+        self.config = config or load_history_config()
+        self.max_bytes = int(self.config.max_size_mb * 1024 * 1024)
+
+        connection = self._connect()
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Only takes effect on a new database
+        connection.execute("PRAGMA journal_mode = WAL")          # Readers do not wait for the writer
+        connection.executescript(SCHEMA)
+        connection.close()
+
+        self._local = threading.local()     # One read connection per thread
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a new connection to the database.
+        """
+
+        return sqlite3.connect(self.config.path, timeout=10)
+
+    def _reader(self) -> sqlite3.Connection:
+        """
+        Returns the read connection of the calling thread.
+        """
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+
+        return connection
+
+    def add(self, image: Image.Image, source_text: str, translated_text: str, source_language: str = None,
+            target_language: str = None, image_hash: str = None):
+        """
+        Queues a capture to be stored. Returns immediately.
+
+        Args:
+            image: The captured PIL Image. It must not be modified afterwards.
+            source_text: The text recognized in the image.
+            translated_text: The translation of the text.
+            source_language: The language code of the text. Defaults to None.
+            target_language: The language code of the translation. Defaults to None.
+            image_hash: The hash_image of the image, if already computed. Defaults to None (hashed on the writer thread).
+        """
+
+        self._queue.put((time.time(), image, image_hash, source_language, target_language, source_text, translated_text))
+
+    def flush(self):
+        """
+        Waits until every queued capture has been written.
+        """
+
+        self._queue.join()
+
+    def close(self):
+        """
+        Writes the queued captures and stops the writer thread.
+        """
+
+        self._queue.put(None)
+        self._writer.join()
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _write_loop(self):
+        """
+        Runs on the writer thread: stores queued captures and keeps the database within its size limit.
+        """
+
+        connection = self._connect()
+        last_image, last_hash = None, None  # The translations of one capture into several languages arrive one after another
+
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+
+                created_at, image, image_hash, source_language, target_language, source_text, translated_text = item
+                if image_hash is None:
+                    image_hash = last_hash if image is last_image else hash_image(image)
+                last_image, last_hash = image, image_hash
+
+                size = len(source_text.encode('utf-8')) + len(translated_text.encode('utf-8'))
+
+                with connection:
+                    # Thumbnail the image only once, however many languages it was translated into
+                    if connection.execute("SELECT 1 FROM thumbnails WHERE image_hash = ?", (image_hash,)).fetchone() is None:
+                        thumbnail = make_thumbnail(image, self.config.thumbnail_size, self.config.thumbnail_quality)
+                        connection.execute("INSERT INTO thumbnails (image_hash, thumbnail) VALUES (?, ?)", (image_hash, thumbnail))
+
+                    connection.execute(
+                        "INSERT INTO captures (created_at, image_hash, source_language, target_language, source_text, translated_text, size) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (created_at, image_hash, source_language, target_language, source_text, translated_text, size))
+
+                self._enforce_size_limit(connection)
+
+            except Exception as e:
+                logging.error(f"An error occurred while saving a capture to the history: {e}")
+
+            finally:
+                self._queue.task_done()
+
+        connection.close()
+
+    def _disk_size(self, connection: sqlite3.Connection) -> int:
+        """
+        Returns the bytes the history takes on disk: the database file, with its full-text index, and the write-ahead log.
+        """
+
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")   # Move the log into the database file, unless a reader holds it
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+
+        wal_path = self.config.path + '-wal'
+        wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+
+        return page_count * page_size + wal_size
+
+    def _enforce_size_limit(self, connection: sqlite3.Connection):
+        """
+        Removes the oldest captures until the history fits in max_bytes on disk, and returns the freed pages to the file system.
+        """
+
+        if self._disk_size(connection) <= self.max_bytes:
+            return
+
+        removed = 0
+        target = int(self.max_bytes * 0.9)  # Make some room, so that the index is not compacted again for every capture
+
+        while True:
+            excess = self._disk_size(connection) - target
+            if excess <= 0:
+                break
+
+            # Remove about as much data as the history is too large, then measure again: the index and
+            # partly filled pages make the file larger than the data alone
+            freed = 0
+            with connection:
+                for entry_id, image_hash, size in connection.execute("SELECT id, image_hash, size FROM captures ORDER BY created_at, id").fetchall():
+                    if freed >= excess:
+                        break
+                    connection.execute("DELETE FROM captures WHERE id = ?", (entry_id,))
+                    freed += size + 1   # Count every capture, so that the loop always makes progress
+                    removed += 1
+
+                    # The thumbnail goes with the last capture of its image
+                    row = connection.execute("SELECT LENGTH(thumbnail) FROM thumbnails WHERE image_hash = ? "
+                                             "AND NOT EXISTS (SELECT 1 FROM captures WHERE image_hash = ?)", (image_hash, image_hash)).fetchone()
+                    if row is not None:
+                        connection.execute("DELETE FROM thumbnails WHERE image_hash = ?", (image_hash,))
+                        freed += row[0]
+
+            if freed == 0:
+                break   # Nothing left to remove
+
+            # FTS5 only drops the index entries of deleted captures when it merges its segments
+            with connection:
+                connection.execute("INSERT INTO captures_fts (captures_fts) VALUES ('optimize')")
+            connection.executescript("PRAGMA incremental_vacuum")  # Run to completion: execute() would free a single page
+
+        if removed:
+            logging.info(f"Removed {removed} old capture(s) to keep the history under {self.config.max_size_mb} MB.")
+
+    def search(self, text: str, limit: int = 50) -> list:
+        """
+        Returns the captures whose recognized or translated text contains every word of the query,
+        most recent first. An empty query returns the most recent captures.
+        """
+
+        match_query = build_match_query(text)
+        if not match_query:
+            return self.recent(limit)
+
+        rows = self._reader().execute(
+            f"SELECT {ENTRY_COLUMNS} FROM captures WHERE id IN (SELECT rowid FROM captures_fts WHERE captures_fts MATCH ?) "
+            "ORDER BY created_at DESC, id DESC LIMIT ?", (match_query, limit)).fetchall()
+
+        return [HistoryEntry(*row) for row in rows]
+
+    def recent(self, limit: int = 50) -> list:
+        """
+        Returns the most recent captures, most recent first.
+        """
+
+        rows = self._reader().execute(
+            f"SELECT {ENTRY_COLUMNS} FROM captures ORDER BY created_at DESC, id DESC LIMIT ?", (limit,)).fetchall()
+
+        return [HistoryEntry(*row) for row in rows]
+
+    def find_by_image(self, image_hash: str, source_language: str = None, target_language: str = None):
+        """
+        Returns the most recent capture of an identical image translated between the same
+        languages, or None. Used to skip OCR and translation for repeated captures.
+        """
+
+        row = self._reader().execute(
+            f"SELECT {ENTRY_COLUMNS} FROM captures WHERE image_hash = ? AND source_language IS ? AND target_language IS ? "
+            "ORDER BY created_at DESC, id DESC LIMIT 1", (image_hash, source_language, target_language)).fetchone()
+
+        return HistoryEntry(*row) if row else None
+
+    def get_thumbnail(self, entry_id: int):
+        """
+        Returns the JPEG thumbnail of a capture as bytes, or None if the capture no longer exists.
+        """
+
+        row = self._reader().execute(
+            "SELECT thumbnails.thumbnail FROM captures JOIN thumbnails ON thumbnails.image_hash = captures.image_hash "
+            "WHERE captures.id = ?", (entry_id,)).fetchone()
+
+        return row[0] if row else None
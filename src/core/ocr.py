@@ -5,7 +5,8 @@ This module contains the functionality for performing Optical Character Recognit
 to extract text from images using the pytesseract library.
 """
 
-from PIL import Image
+from dataclasses import dataclass, field
+from PIL import Image, ImageChops
 
 import pytesseract
 import logging
@@ -29,11 +30,204 @@ def get_tessdata_path():    # Find the path from config.ini file
         
         return default_path
 
+def get_reocr_threshold() -> float:    # Find the re-OCR confidence threshold from config.ini file
+    config = configparser.ConfigParser()
+    config.read('config.ini')  # Assuming config.ini is in the root directory
+
+    try:
+        return config.getfloat('Tesseract', 'REOCR_CONFIDENCE_THRESHOLD', fallback=0.0)
+    except ValueError:
+        logging.warning("Invalid REOCR_CONFIDENCE_THRESHOLD in config.ini. Re-OCR is disabled.")
+
+        return 0.0
+
 # Set TESSDATA_PREFIX from the configuration
 tessdata_dir = get_tessdata_path()
 os.environ['TESSDATA_PREFIX'] = tessdata_dir
 
-def extract_text_from_image(image: Image.Image, language: str = None) -> str:
+# Lines recognized with a lower mean confidence (0-100) are OCRed again with ACCURATE_PROFILE. 0 disables re-OCR.
+reocr_threshold = get_reocr_threshold()
+
+@dataclass
+class OcrProfile:
+    """
+    Tesseract settings for one OCR pass.
+    """
+
+    psm: int = 3        # Page segmentation mode
+    scale: float = 1.0  # The image is resized by this factor before OCR
+    oem: int = 3        # OCR engine mode
+
+# Cheap settings for the whole image, and expensive ones for the regions it was unsure about
+FAST_PROFILE = OcrProfile(psm=3, scale=1.0)
+ACCURATE_PROFILE = OcrProfile(psm=7, scale=2.0)     # A single upscaled text line
+
+@dataclass
+class OcrWord:
+    """
+    A recognized word with its bounding box (in pixels of the original image) and confidence (0-100).
+    """
+
+    text: str
+    left: int
+    top: int
+    width: int
+    height: int
+    confidence: float
+
+@dataclass
+class OcrLine:
+    """
+    A line of recognized words.
+    """
+
+    words: list = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return " ".join(word.text for word in self.words)
+
+    @property
+    def confidence(self) -> float:
+        """
+        The mean confidence of the words in the line, or 0 if the line is empty.
+        """
+
+        if not self.words:
+            return 0.0
+
+        return sum(word.confidence for word in self.words) / len(self.words)
+
+    @property
+    def box(self) -> tuple:
+        """
+        The bounding box (left, top, right, bottom) of the line.
+        """
+
+        return (min(word.left for word in self.words), min(word.top for word in self.words),
+                max(word.left + word.width for word in self.words), max(word.top + word.height for word in self.words))
+
+@dataclass
+class OcrBlock:
+    """
+    A block (paragraph) of recognized lines.
+    """
+
+    lines: list = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(line.text for line in self.lines)
+
+@dataclass
+class OcrResult:
+    """
+    Structured OCR output: blocks of lines of words, in reading order.
+    """
+
+    blocks: list = field(default_factory=list)
+
+    @property
+    def lines(self) -> list:
+        return [line for block in self.blocks for line in block.lines]
+
+    @property
+    def words(self) -> list:
+        return [word for line in self.lines for word in line.words]
+
+    @property
+    def text(self) -> str:
+        """
+        The recognized text, with lines separated by newlines and blocks by blank lines.
+        """
+
+        return "\n\n".join(block.text for block in self.blocks if block.lines)
+
+def _tesseract_language(language: str):
+    """
+    Maps the language codes used by the rest of the application to Tesseract language codes.
+    """
+
+    if language == 'ru':
+        return 'rus'
+
+    return language
+
+def _runs_of_inked_rows(ink: Image.Image) -> list:
+    """
+    Returns the runs of consecutive rows of an ink mask that contain ink (text lines), as (top, bottom) pairs.
+    """
+
+    _, rows_with_ink = ink.getprojection()
+
+    lines = []
+    top = None
+    for row, has_ink in enumerate(rows_with_ink):
+        if has_ink and top is None:
+            top = row
+        elif not has_ink and top is not None:
+            lines.append((top, row))
+            top = None
+    if top is not None:
+        lines.append((top, ink.size[1]))
+
+    return lines
+
+def split_into_text_blocks(image: Image.Image, padding: int = 4, ink_threshold: int = 48) -> list:
+    """
+    Splits an image into horizontal blocks of text separated by blank rows, so that each block
+    can be OCRed on its own. Lines closer together than about a line height stay in one block.
+
+    Args:
+        image: A PIL Image object containing the text.
+        padding: Blank rows kept above and below each block, in pixels.
+        ink_threshold: How far a pixel must differ from the background colour to count as text (0-255).
+
+    Returns:
+        A list of (top, bottom) row ranges in reading order (top to bottom). Empty if the image is blank.
+    """
+
+    gray = image.convert('L')
+    width, height = gray.size
+
+    # The most common grey level is taken as the background colour
+    histogram = gray.histogram()
+    background = histogram.index(max(histogram))
+
+    # Mark every pixel that differs noticeably from the background, then find the rows that contain any
+    ink = ImageChops.difference(gray, Image.new('L', gray.size, background)).point(lambda value: 255 if value > ink_threshold else 0)
+    lines = _runs_of_inked_rows(ink)
+
+    # Vertical rules (window borders, table lines, scrollbars) put ink in every row and hide the gaps
+    # between lines. Ignore the columns inked over most of the height when that reveals more lines.
+    column_coverage = ink.resize((width, 1), Image.Resampling.BOX).tobytes()     # Mean ink of each column, 0-255
+    rule_columns = [column for column, coverage in enumerate(column_coverage) if coverage >= 0.9 * 255]
+    if rule_columns:
+        without_rules = ink.copy()
+        for column in rule_columns:
+            without_rules.paste(0, (column, 0, column + 1, height))
+
+        lines_without_rules = _runs_of_inked_rows(without_rules)
+        if len(lines_without_rules) > len(lines):
+            lines = lines_without_rules
+
+    if not lines:
+        return []
+
+    # Merge lines separated by less than most of a typical line height into blocks (paragraphs)
+    line_heights = sorted(bottom - top for top, bottom in lines)
+    merge_gap = max(2, int(line_heights[len(line_heights) // 2] * 0.8))
+
+    blocks = [list(lines[0])]
+    for top, bottom in lines[1:]:
+        if top - blocks[-1][1] < merge_gap:
+            blocks[-1][1] = bottom
+        else:
+            blocks.append([top, bottom])
+
+    return [(max(0, top - padding), min(height, bottom + padding)) for top, bottom in blocks]
+
+def extract_text_from_image(image: Image.Image, language: str = None, reencode: bool = True) -> str:
     """
     Extracts text from a given PIL Image object using Tesseract OCR.
 
@@ -41,6 +235,9 @@ def extract_text_from_image(image: Image.Image, language: str = None) -> str:
         image: A PIL Image object containing the text to be extracted.
         language: The language code for OCR (e.g., 'rus' for Russian, 'eng' for English).
                          Defaults to None.
+        reencode: Whether to pass the image through an in-memory PNG first. Defaults to True.
+                         Images whose mode Tesseract reads directly, such as the 'L' images mapped
+                         from shared memory by shared_images, can skip this copy.
 
     Returns:
         A string containing the extracted text. Returns an empty string if no text is found
@@ -50,22 +247,23 @@ def extract_text_from_image(image: Image.Image, language: str = None) -> str:
     if image is None:
         raise AttributeError("Input image cannot be None.")
     try:
-        # Save the Pillow image to an in-memory byte stream in PNG format.
-        # Tesseract often works well with PNG format.
-        image_bytes = io.BytesIO()
-        image.save(image_bytes, format="PNG")
-        image_bytes.seek(0)   # Reset the buffer's position to the beginning
+        pil_image_from_bytes = image
+
+        if reencode:
+            # Save the Pillow image to an in-memory byte stream in PNG format.
+            # Tesseract often works well with PNG format.
+            image_bytes = io.BytesIO()
+            image.save(image_bytes, format="PNG")
+            image_bytes.seek(0)   # Reset the buffer's position to the beginning
 
-        # Open the image from the byte stream using PIL again.
-        # This might help ensure the format is correctly understood by pytesseract.
-        pil_image_from_bytes = Image.open(image_bytes)
+            # Open the image from the byte stream using PIL again.
+            # This might help ensure the format is correctly understood by pytesseract.
+            pil_image_from_bytes = Image.open(image_bytes)
 
         # Perform OCR using pytesseract with the newly opened PIL Image object.
+        # Fully automatic page segmentation, which also finds columns inside the blocks produced by split_into_text_blocks
         config = '--oem 3 --psm 3'
-        lang_param = language
-
-        if language == 'ru':
-            lang_param = 'rus'
+        lang_param = _tesseract_language(language)
 
         extracted_text: str = pytesseract.image_to_string(pil_image_from_bytes, lang=lang_param, config=config)
 
@@ -82,6 +280,115 @@ def extract_text_from_image(image: Image.Image, language: str = None) -> str:
 
         return ""
 
+def parse_ocr_data(data: dict, scale: float = 1.0, offset: tuple = (0, 0)) -> OcrResult:
+    """
+    Builds an OcrResult from the dictionary returned by pytesseract.image_to_data.
+
+    Args:
+        data: The output of image_to_data with output_type=pytesseract.Output.DICT.
+        scale: The factor the image was resized by before OCR. Boxes are scaled back by it.
+        offset: The (left, top) position of the OCRed region in the original image.
+
+    Returns:
+        An OcrResult. Empty words and entries without a confidence are left out.
+    """
+
+    blocks = {}     # block number -> {line key -> OcrLine}, in the order Tesseract reports them
+
+    for index, text in enumerate(data['text']):
+        confidence = float(data['conf'][index])
+        if confidence < 0 or not text.strip():
+            continue    # Not a word (page, block, paragraph or line entry) or an empty word
+
+        word = OcrWord(text=text.strip(),
+                       left=int(data['left'][index] / scale) + offset[0],
+                       top=int(data['top'][index] / scale) + offset[1],
+                       width=int(data['width'][index] / scale),
+                       height=int(data['height'][index] / scale),
+                       confidence=confidence)
+
+        lines = blocks.setdefault(data['block_num'][index], {})
+        line_key = (data['par_num'][index], data['line_num'][index])
+        lines.setdefault(line_key, OcrLine()).words.append(word)
+
+    return OcrResult(blocks=[OcrBlock(lines=list(lines.values())) for lines in blocks.values()])
+
+def extract_structured_text(image: Image.Image, language: str = None, profile: OcrProfile = FAST_PROFILE, offset: tuple = (0, 0)) -> OcrResult:
+    """
+    Extracts words, lines and blocks with bounding boxes and confidences from a PIL Image object.
+
+    Args:
+        image: A PIL Image object containing the text to be extracted.
+        language: The language code for OCR (e.g., 'rus' for Russian, 'eng' for English).
+                         Defaults to None.
+        profile: The OcrProfile to use. Defaults to FAST_PROFILE.
+        offset: The (left, top) position of the image inside a larger one, added to every box.
+
+    Returns:
+        An OcrResult. Returns an empty OcrResult if an error occurs during OCR.
+        Raises AttributeError if the input image is None.
+    """
+
+    if image is None:
+        raise AttributeError("Input image cannot be None.")
+    try:
+        if profile.scale != 1.0:
+            image = image.resize((max(1, int(image.width * profile.scale)), max(1, int(image.height * profile.scale))), Image.LANCZOS)
+
+        data = pytesseract.image_to_data(image, lang=_tesseract_language(language),
+                                         config=f'--oem {profile.oem} --psm {profile.psm}', output_type=pytesseract.Output.DICT)
+
+        return parse_ocr_data(data, scale=profile.scale, offset=offset)
+
+    except pytesseract.TesseractNotFoundError:
+        error_message = "Tesseract is not installed or not in your PATH. " \
+                        "Please make sure Tesseract OCR is installed and configured correctly."
+        logging.error(error_message)
+
+        return OcrResult()
+    except Exception as e:
+        logging.error(f"An error occurred during OCR: {e}")
+
+        return OcrResult()
+
+def extract_text_with_reocr(image: Image.Image, language: str = None, confidence_threshold: float = 60.0,
+                            fast_profile: OcrProfile = FAST_PROFILE, accurate_profile: OcrProfile = ACCURATE_PROFILE, padding: int = 4) -> OcrResult:
+    """
+    OCRs the whole image with the fast profile, then OCRs only the lines recognized with low
+    confidence again with the accurate profile. This gives close to accurate-profile output at
+    close to fast-profile cost.
+
+    Args:
+        image: A PIL Image object containing the text to be extracted.
+        language: The language code for OCR. Defaults to None.
+        confidence_threshold: Lines with a lower mean confidence (0-100) are OCRed again. Defaults to 60.
+        fast_profile: The OcrProfile for the first pass. Defaults to FAST_PROFILE.
+        accurate_profile: The OcrProfile for the low-confidence lines. Defaults to ACCURATE_PROFILE.
+        padding: Pixels added around each line before it is OCRed again.
+
+    Returns:
+        An OcrResult in which every re-OCRed line has been replaced if the second pass was more confident.
+    """
+
+    result = extract_structured_text(image, language=language, profile=fast_profile)
+
+    for block in result.blocks:
+        for index, line in enumerate(block.lines):
+            if line.confidence >= confidence_threshold:
+                continue
+
+            left, top, right, bottom = line.box
+            region = (max(0, left - padding), max(0, top - padding), min(image.width, right + padding), min(image.height, bottom + padding))
+            retry = extract_structured_text(image.crop(region), language=language, profile=accurate_profile, offset=region[:2])
+
+            # Keep the second pass only if it is more confident about the line as a whole
+            retried_line = OcrLine(words=retry.words)
+            if retried_line.words and retried_line.confidence > line.confidence:
+                logging.info(f"Re-OCR raised line confidence from {line.confidence:.0f} to {retried_line.confidence:.0f}")
+                block.lines[index] = retried_line
+
+    return result
+
 if __name__ == '__main__':
     # Example usage (this will run only if this script is executed directly)
     try:
@@ -5,13 +5,190 @@ This module contains the core logic for processing images, including performing
 Optical Character Recognition (OCR) and translating the extracted text.
 """
 
+from dataclasses import dataclass
 from PIL import Image
 from . import ocr
+from . import shared_images
+from . import translation_memory
 from . import translator
 
 import asyncio
+import functools
 
-async def process_image_and_translate(image: Image.Image, target_language: str = 'en', source_language: str = None) -> str:
+# Characters Tesseract tends to read from borders, cursors and icons rather than from text. They are
+# only noise on their own: inside a word they are text (Catalan "l·l", "~5 min", "a|b")
+NOISE_CHARACTERS = "|¦~`^•·■□▪▫●○◆◇►◄▲▼"
+EDGE_NOISE_CHARACTERS = "|¦•·■□▪▫●○◆◇►◄▲▼"  # Borders and bullets, also stripped where stuck to the start or end of a line
+INVISIBLE_TABLE = str.maketrans("", "", "\u200b\ufeff\x0c")  # Zero-width characters and form feeds, never text
+HYPHENS = "-\u00ad\u2010"           # Hyphen-minus, soft hyphen and hyphen
+SENTENCE_ENDINGS = ".!?:;…"
+
+@dataclass
+class NormalizedText:
+    """
+    OCR output cleaned up for translation, with a mapping back to the original lines.
+    """
+
+    text: str               # The normalized lines, separated by newlines
+    original_lines: list    # The lines of the raw OCR output
+    line_map: list          # For each normalized line, the indices of the original lines it was built from
+
+@dataclass
+class ProcessingResult:
+    """
+    The text extracted from an image together with its translation.
+    """
+
+    source_text: str
+    translated_text: str
+    normalized: NormalizedText = None   # How source_text was built from the raw OCR output, if text was found
+    memory_match: translation_memory.MemoryMatch = None    # A similar earlier text found in the translation memory, reused or only flagged
+
+def _continues_line(previous: str, line: str) -> bool:
+    """
+    Returns True if line looks like the continuation of previous, wrapped by the screen layout.
+    Lines such as menu entries or labels, which do not continue a sentence, stay separate.
+    """
+
+    if previous[-1] in SENTENCE_ENDINGS:
+        return False
+
+    return previous[-1] == ',' or line[0].islower()
+
+def _strip_noise(line: str) -> str:
+    """
+    Removes the noise glyphs that stand alone, or stick to the start or end of the line,
+    and collapses whitespace. Glyphs inside words are kept.
+    """
+
+    words = [word for word in line.translate(INVISIBLE_TABLE).split() if word.strip(NOISE_CHARACTERS)]
+
+    if words:
+        words[0] = words[0].lstrip(EDGE_NOISE_CHARACTERS)   # e.g. a window border read as "|Сохранить"
+        words[-1] = words[-1].rstrip(EDGE_NOISE_CHARACTERS)
+
+    return " ".join(word for word in words if word)
+
+def normalize_ocr_text(text: str) -> NormalizedText:
+    """
+    Prepares raw OCR output for translation: re-flows lines wrapped by the screen layout into
+    paragraphs, joins words hyphenated across lines, strips noise glyphs and lines without any
+    letters or digits, and collapses whitespace. The result is shorter, so fewer characters are
+    sent for translation, and more stable between captures, so the caches hit more often.
+
+    Args:
+        text: The raw OCR output.
+
+    Returns:
+        A NormalizedText. Its text is empty if nothing but noise was found.
+    """
+
+    original_lines = text.splitlines()
+    paragraphs = []         # [text, [original line indices]]
+    paragraph_open = False  # Whether the next line may continue the last paragraph
+
+    for index, line in enumerate(original_lines):
+        if not line.strip():
+            paragraph_open = False  # A blank line always ends the paragraph
+            continue
+
+        cleaned = _strip_noise(line)
+        if not any(character.isalnum() for character in cleaned):
+            continue    # Only noise (e.g. a border read as "| —"), skip it without ending the paragraph
+
+        if paragraph_open and _continues_line(paragraphs[-1][0], cleaned):
+            previous = paragraphs[-1][0]
+
+            if previous[-1] in HYPHENS and len(previous) > 1 and previous[-2].isalpha() and cleaned[0].islower():
+                paragraphs[-1][0] = previous[:-1] + cleaned   # "transla-" + "tion" -> "translation"
+            else:
+                paragraphs[-1][0] = previous + " " + cleaned
+
+            paragraphs[-1][1].append(index)
+        else:
+            paragraphs.append([cleaned, [index]])
+
+        paragraph_open = True
+
+    return NormalizedText(text="\n".join(paragraph for paragraph, _ in paragraphs),
+                          original_lines=original_lines,
+                          line_map=[line_indices for _, line_indices in paragraphs])
+
+def recognize_text(image: Image.Image, source_language: str = None, reencode: bool = True) -> str:
+    """
+    Performs OCR on the input image with the configured strategy: a fast pass followed by
+    re-OCR of low-confidence lines when REOCR_CONFIDENCE_THRESHOLD is set in config.ini,
+    a single pass otherwise.
+
+    Args:
+        image: A PIL Image object representing the image to process.
+        source_language: The language code of the text in the image. Defaults to None.
+        reencode: Passed on to ocr.extract_text_from_image. Defaults to True.
+
+    Returns:
+        A string containing the extracted text, or an empty string if no text is found.
+    """
+
+    if ocr.reocr_threshold > 0:
+        return ocr.extract_text_with_reocr(image, language=source_language, confidence_threshold=ocr.reocr_threshold).text
+
+    return ocr.extract_text_from_image(image, language=source_language, reencode=reencode)
+
+async def extract_text(image: Image.Image, source_language: str = None, executor=None) -> str:
+    """
+    Performs OCR on the input image. When an executor is given, OCR runs in it so that the
+    event loop stays free to serve other requests while Tesseract is working.
+
+    Args:
+        image: A PIL Image object representing the image to process.
+        source_language: The language code of the text in the image. Defaults to None.
+        executor: An optional concurrent.futures.Executor or shared_images.SharedMemoryOcrPool to run
+                  OCR in. Defaults to None (run inline).
+
+    Returns:
+        A string containing the extracted text, or an empty string if no text is found.
+    """
+
+    if executor is None:
+        return recognize_text(image, source_language=source_language)
+
+    if isinstance(executor, shared_images.SharedMemoryOcrPool):
+        # The worker process reads the pixels from shared memory instead of receiving a pickled copy
+        return await executor.run(recognize_text, image, source_language=source_language, reencode=False)
+
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(executor, functools.partial(recognize_text, image, source_language=source_language))
+
+async def process_image(image: Image.Image, target_language: str = 'en', source_language: str = None, executor=None) -> ProcessingResult:
+    """
+    Performs OCR on the input image and translates the extracted text, keeping both.
+
+    Args:
+        image: A PIL Image object representing the image to process.
+        target_language: The ISO 639-1 code of the target language for translation.
+                         Defaults to 'en' (English).
+        source_language: The ISO 639-1 code of the source language.
+                         Defaults to None, allowing the translator to potentially auto-detect the language.
+        executor: An optional concurrent.futures.Executor or shared_images.SharedMemoryOcrPool to run
+                  OCR in. Defaults to None (run inline).
+
+    Returns:
+        A ProcessingResult. If no text is extracted, its source_text is empty and its
+        translated_text is "No text found in the image.".
+    """
+
+    normalized = normalize_ocr_text(await extract_text(image, source_language=source_language, executor=executor))
+
+    if not normalized.text:
+        return ProcessingResult(source_text="", translated_text="No text found in the image.")
+
+    translation = await translator.translate_text_detailed(normalized.text, dest_lang=target_language, src_lang=source_language)
+
+    return ProcessingResult(source_text=normalized.text, translated_text=translation.text, normalized=normalized,
+                            memory_match=translation.memory_match)
+
+async def process_image_and_translate(image: Image.Image, target_language: str = 'en', source_language: str = None, executor=None) -> str:
     """
     Performs OCR on the input image to extract text and then translates
     the extracted text to the specified target language.
@@ -22,26 +199,167 @@ async def process_image_and_translate(image: Image.Image, target_language: str =
                          Defaults to 'en' (English).
         source_language: The ISO 639-1 code of the source language.
                          Defaults to None, allowing the translator to potentially auto-detect the language.
+        executor: An optional concurrent.futures.Executor or shared_images.SharedMemoryOcrPool to run
+                  OCR in. Defaults to None (run inline).
 
     Returns:
         A string containing the translated text. Returns "No text found in the image." if
-        no text is extracted. Returns an empty string if translation fails.
+        no text is extracted. Returns an error message if translation fails.
+    """
+
+    result = await process_image(image, target_language=target_language, source_language=source_language, executor=executor)
+
+    return result.translated_text
+
+async def translate_to_languages(text: str, target_languages: list, source_language: str = None):
+    """
+    Translates one text into several languages concurrently. All requests share the translation
+    cache and one HTTP connection pool.
+
+    Args:
+        text: The text to translate.
+        target_languages: The ISO 639-1 codes of the target languages. Duplicates are translated once.
+        source_language: The ISO 639-1 code of the source language. Defaults to None.
+
+    Yields:
+        Tuples (target_language, translated_text) in the order the translations complete.
+    """
+
+    async for target_language, translation in _translate_to_languages_detailed(text, target_languages, source_language=source_language):
+        yield target_language, translation.text
+
+async def _translate_to_languages_detailed(text: str, target_languages: list, source_language: str = None):
+    """
+    Like translate_to_languages, but yields tuples (target_language, translator.TranslationResult).
+    """
+
+    async with translator.translation_session():
+        tasks = {asyncio.create_task(translator.translate_text_detailed(text, src_lang=source_language, dest_lang=target_language)): target_language
+                 for target_language in dict.fromkeys(target_languages)}
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    yield tasks[task], task.result()
+
+        finally:
+            # The caller stopped early, do not leave requests running
+            for task in pending:
+                task.cancel()
+
+async def process_image_and_translate_many(image: Image.Image, target_languages: list, source_language: str = None, executor=None):
     """
+    Performs OCR on the input image once and translates the extracted text into several
+    languages concurrently.
+
+    Args:
+        image: A PIL Image object representing the image to process.
+        target_languages: The ISO 639-1 codes of the target languages.
+        source_language: The ISO 639-1 code of the source language.
+                         Defaults to None, allowing the translator to potentially auto-detect the language.
+        executor: An optional concurrent.futures.Executor or shared_images.SharedMemoryOcrPool to run
+                  OCR in. Defaults to None (run inline).
+
+    Yields:
+        Tuples (target_language, ProcessingResult) in the order the translations complete.
+    """
+
+    normalized = normalize_ocr_text(await extract_text(image, source_language=source_language, executor=executor))
+
+    if not normalized.text:
+        for target_language in dict.fromkeys(target_languages):
+            yield target_language, ProcessingResult(source_text="", translated_text="No text found in the image.")
+        return
+
+    async for target_language, translation in _translate_to_languages_detailed(normalized.text, target_languages, source_language=source_language):
+        yield target_language, ProcessingResult(source_text=normalized.text, translated_text=translation.text, normalized=normalized,
+                                                memory_match=translation.memory_match)
+
+async def stream_image_and_translate(image: Image.Image, target_language: str = 'en', source_language: str = None, executor=None):
+    """
+    Performs OCR and translation block by block, so that the first lines are translated while
+    the rest of the image is still being recognized.
+
+    The image is split into blocks of text (see ocr.split_into_text_blocks). Every block is OCRed
+    in the executor with the configured strategy (see recognize_text) and sent for translation as
+    soon as its text is known. An image with a single block, or none found, is OCRed whole.
+
+    Args:
+        image: A PIL Image object representing the image to process.
+        target_language: The ISO 639-1 code of the target language for translation.
+                         Defaults to 'en' (English).
+        source_language: The ISO 639-1 code of the source language.
+                         Defaults to None, allowing the translator to potentially auto-detect the language.
+        executor: An optional concurrent.futures.Executor or shared_images.SharedMemoryOcrPool to run
+                  OCR in. Defaults to None (the event loop's default executor).
+
+    Yields:
+        A ProcessingResult for each block with text, in reading order. If no text is found at all,
+        a single ProcessingResult with the "No text found in the image." message.
+    """
+
+    loop = asyncio.get_running_loop()
+    width = image.size[0]
+
+    shared_image = None     # With worker processes, the image in shared memory; every block is a band of it
+    tasks = []
+
+    async def process_block(top: int, bottom: int) -> ProcessingResult:
+        """
+        OCRs one block and translates its text as soon as it is available.
+        """
+
+        if shared_image is not None:
+            extracted_text = await executor.run(recognize_text, shared_image, region=(top, bottom), source_language=source_language, reencode=False)
+        else:
+            block = image.crop((0, top, width, bottom))
+            extracted_text = await loop.run_in_executor(executor, functools.partial(recognize_text, block, source_language=source_language))
+        normalized = normalize_ocr_text(extracted_text)
+
+        if not normalized.text:
+            return ProcessingResult(source_text="", translated_text="")
+
+        translation = await translator.translate_text_detailed(normalized.text, dest_lang=target_language, src_lang=source_language)
+
+        return ProcessingResult(source_text=normalized.text, translated_text=translation.text, normalized=normalized,
+                                memory_match=translation.memory_match)
+
+    found_text = False
+
+    async with translator.translation_session():
+        try:
+            blocks = ocr.split_into_text_blocks(image)
+            if len(blocks) <= 1:
+                # Nothing to stream: OCR the whole capture, as without splitting. No block at all may still be
+                # text too faint for the ink threshold of split_into_text_blocks, which Tesseract can read
+                blocks = [(0, image.size[1])]
+
+            if isinstance(executor, shared_images.SharedMemoryOcrPool):
+                shared_image = executor.share(image)
+
+            # Start every block at once: the executor bounds how many are OCRed in parallel, top blocks first
+            tasks = [asyncio.create_task(process_block(top, bottom)) for top, bottom in blocks]
+
+            for task in tasks:   # Reading order
+                result = await task
 
-    extracted_text = ocr.extract_text_from_image(image, language=source_language)
+                if result.source_text:
+                    found_text = True
+                    yield result
 
-    if not extracted_text:
-        return "No text found in the image."
-    else:
-        translated_text = await translator.translate_text(extracted_text, dest_lang=target_language, src_lang=source_language)
+        finally:
+            # The caller stopped early or an error occurred, do not leave work running
+            for task in tasks:
+                task.cancel()
 
-        return translated_text
-    # This return statement seems redundant as the 'if' condition covers all cases.
-    # If no text, it returns "No text found...". If text, it returns translated text.
-    # If translation fails in translator.py, it returns an error message.
-    # So, this line might not be necessary. But it's good practice to have it.
+            if shared_image is not None:
+                shared_image.release()     # Blocks already sent to a worker keep the memory until they are done
 
-    return ""
+    if not found_text:
+        yield ProcessingResult(source_text="", translated_text="No text found in the image.")
 
 if __name__ == '__main__':
 
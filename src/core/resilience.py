@@ -0,0 +1,346 @@
+# src/core/resilience.py
+
+"""
+This module contains tail-latency controls for calls to remote services: per-request
+deadlines, bounded retries with jittered backoff, hedged requests and a circuit breaker.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+
+import asyncio
+import configparser
+import logging
+import random
+import time
+
+# Configure logging to display any potential errors or warnings
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class CircuitOpenError(Exception):
+    """
+    Raised when the circuit breaker rejects a call because the backend is considered down.
+    """
+
+@dataclass
+class ResiliencePolicy:
+    """
+    Settings that control how a remote call is attempted.
+    """
+
+    deadline: float = 15.0          # Total time budget for one request (all attempts and backoff), in seconds
+    attempt_timeout: float = 6.0    # Time budget for a single attempt, in seconds
+    max_retries: int = 2            # Retries after the first attempt, for transient errors only
+    backoff_base: float = 0.25      # Base delay of the exponential backoff, in seconds
+    backoff_max: float = 4.0        # Upper bound of a single backoff delay, in seconds
+    hedge_enabled: bool = False     # Fire a second request when the first one is slower than usual
+    hedge_quantile: float = 0.95    # Latency quantile after which the hedge is fired
+    hedge_min_delay: float = 0.2    # Never hedge earlier than this, in seconds
+    breaker_threshold: int = 5      # Consecutive failures that open the circuit
+    breaker_reset_timeout: float = 30.0  # Time the circuit stays open before a probe is allowed, in seconds
+
+@dataclass
+class CallOutcome:
+    """
+    The result of a call made through call_with_policy, together with the path that served it.
+    """
+
+    result: object
+    path: str       # 'primary', 'hedge', or 'retry-<n>:primary' / 'retry-<n>:hedge'
+    attempts: int
+    elapsed: float
+
+def load_policy(config_path: str = 'config.ini', section: str = 'Translation') -> ResiliencePolicy:
+    """
+    Reads a ResiliencePolicy from the given section of config.ini.
+
+    Args:
+        config_path: Path of the configuration file. Defaults to 'config.ini' in the working directory.
+        section: Name of the section holding the settings. Defaults to 'Translation'.
+
+    Returns:
+        A ResiliencePolicy. Settings missing from the file keep their default values.
+    """
+
+    policy = ResiliencePolicy()
+    config = configparser.ConfigParser()
+    config.read(config_path)
+
+    if section not in config:
+        return policy
+
+    options = config[section]
+    try:
+        policy.deadline = options.getfloat('DEADLINE', policy.deadline)
+        policy.attempt_timeout = options.getfloat('ATTEMPT_TIMEOUT', policy.attempt_timeout)
+        policy.max_retries = options.getint('MAX_RETRIES', policy.max_retries)
+        policy.backoff_base = options.getfloat('BACKOFF_BASE', policy.backoff_base)
+        policy.backoff_max = options.getfloat('BACKOFF_MAX', policy.backoff_max)
+        policy.hedge_enabled = options.getboolean('HEDGE_ENABLED', policy.hedge_enabled)
+        policy.hedge_quantile = options.getfloat('HEDGE_QUANTILE', policy.hedge_quantile)
+        policy.hedge_min_delay = options.getfloat('HEDGE_MIN_DELAY', policy.hedge_min_delay)
+        policy.breaker_threshold = options.getint('BREAKER_THRESHOLD', policy.breaker_threshold)
+        policy.breaker_reset_timeout = options.getfloat('BREAKER_RESET_TIMEOUT', policy.breaker_reset_timeout)
+    except ValueError as e:
+        logging.warning(f"Invalid value in the [{section}] section of {config_path}: {e}. Using defaults for the rest.")
+
+    return policy
+
+class LatencyTracker:
+    """
+    Keeps a sliding window of recent successful latencies to derive the hedging delay.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initializes the LatencyTracker.
+
+        Args:
+            window: Number of most recent samples kept.
+            min_samples: Number of samples needed before a quantile is reported.
+        """
+
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        """
+        Adds a latency sample, in seconds.
+        """
+
+        self.samples.append(seconds)
+
+    def quantile(self, q: float):
+        """
+        Returns the q-quantile (0 <= q <= 1) of the recorded latencies, or None if there are
+        not enough samples yet.
+        """
+
+        if len(self.samples) < self.min_samples:
+            return None
+
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+
+        return ordered[index]
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated failures, then lets a single probe through once the reset
+    timeout has passed to find out whether the backend has recovered.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        """
+        Initializes the CircuitBreaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_timeout: Seconds the circuit stays open before a probe is allowed.
+            clock: Function returning the current time in seconds (monotonic).
+        """
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self._state = self.CLOSED
+        self._failures = 0          # Consecutive failures while closed
+        self._opened_at = 0.0       # When the circuit was last opened
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """
+        The current state of the breaker: 'closed', 'open' or 'half-open'.
+        """
+
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a call may be made now. In the half-open state only one probe is let through.
+        """
+
+        state = self.state
+
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        return False
+
+    def release_probe(self):
+        """
+        Ends a half-open probe that finished without telling whether the backend works (it was
+        cancelled, for example), so that the next request can probe instead.
+        """
+
+        self._probe_in_flight = False
+
+    def record_success(self):
+        """
+        Records a successful call and closes the circuit.
+        """
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """
+        Records a failed call. Opens the circuit when the threshold is reached or a probe fails.
+        """
+
+        self._failures += 1
+
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logging.warning(f"Circuit breaker opened after {self._failures} consecutive failure(s).")
+            self._state = self.OPEN
+            self._opened_at = self.clock()
+            self._probe_in_flight = False
+
+def backoff_delay(retry: int, base: float, maximum: float, rng=random) -> float:
+    """
+    Returns the delay before the given retry (0 for the first retry) using exponential
+    backoff with full jitter.
+    """
+
+    return rng.uniform(0, min(maximum, base * (2 ** retry)))
+
+async def _hedged_attempt(operation, timeout: float, hedge_delay):
+    """
+    Runs one attempt of the operation. If hedge_delay is set and the first request has not
+    finished by then, a second request is fired and whichever succeeds first is used.
+
+    Returns:
+        A tuple (result, served_by_hedge). Raises asyncio.TimeoutError when the attempt runs out
+        of time, or the error of the last request that failed.
+    """
+
+    if hedge_delay is None or hedge_delay >= timeout:
+        return await asyncio.wait_for(operation(), timeout), False
+
+    loop = asyncio.get_running_loop()
+    attempt_deadline = loop.time() + timeout
+
+    primary = asyncio.ensure_future(operation())
+    pending = {primary}
+    last_error = None
+
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+        if not done:
+            pending.add(asyncio.ensure_future(operation()))  # The primary is slow, fire the hedge
+
+        while pending:
+            remaining = attempt_deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise asyncio.TimeoutError()
+
+            for task in done:
+                pending.discard(task)
+                if task.exception() is None:
+                    return task.result(), task is not primary
+
+                last_error = task.exception()
+
+        raise last_error
+
+    finally:
+        # Cancel the loser (or everything, on timeout) so no request is left running
+        for task in pending:
+            task.cancel()
+
+async def call_with_policy(operation, policy: ResiliencePolicy, breaker: CircuitBreaker = None,
+                           tracker: LatencyTracker = None, transient_errors: tuple = (asyncio.TimeoutError, ConnectionError),
+                           rng=random) -> CallOutcome:
+    """
+    Calls an asynchronous operation under the given policy.
+
+    Args:
+        operation: A function without arguments that returns a new awaitable each time it is called.
+        policy: The ResiliencePolicy to apply.
+        breaker: An optional CircuitBreaker shared by all calls to the same backend.
+        tracker: An optional LatencyTracker used to derive the hedging delay.
+        transient_errors: Exception types that are retried and count as failures of the backend. Any
+                          other error is raised immediately, without counting against the breaker.
+        rng: Random number generator used for the backoff jitter.
+
+    Returns:
+        A CallOutcome with the result and the path that served it. Raises CircuitOpenError if the
+        breaker rejects the call, asyncio.TimeoutError if the deadline is exceeded, or the last
+        error if all attempts fail.
+    """
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    request_deadline = started + policy.deadline
+    last_error = None
+
+    for attempt in range(policy.max_retries + 1):
+        if attempt:
+            delay = backoff_delay(attempt - 1, policy.backoff_base, policy.backoff_max, rng)
+            if loop.time() + delay >= request_deadline:
+                break  # No time left for another attempt
+            await asyncio.sleep(delay)
+
+        if breaker is not None and not breaker.allow_request():
+            raise CircuitOpenError("The circuit breaker is open; the backend is considered down.") from last_error
+        probing = breaker is not None and breaker.state == CircuitBreaker.HALF_OPEN   # This attempt is the one probe
+
+        remaining = request_deadline - loop.time()
+        hedge_delay = None
+        if policy.hedge_enabled and tracker is not None:
+            observed = tracker.quantile(policy.hedge_quantile)
+            if observed is not None:
+                hedge_delay = max(policy.hedge_min_delay, observed)
+
+        attempt_started = loop.time()
+        try:
+            result, hedged = await _hedged_attempt(operation, min(policy.attempt_timeout, remaining), hedge_delay)
+
+        except transient_errors as e:
+            last_error = e
+            if breaker is not None:
+                breaker.record_failure()
+            logging.warning(f"Attempt {attempt + 1} of {policy.max_retries + 1} failed: {e!r}")
+            continue
+
+        except BaseException:
+            # Errors of the request itself (e.g. an invalid language) and cancellation say nothing about
+            # the backend: do not count them as failures, and do not keep the probe slot taken forever
+            if probing:
+                breaker.release_probe()
+            raise
+
+        if breaker is not None:
+            breaker.record_success()
+        if tracker is not None:
+            tracker.record(loop.time() - attempt_started)
+
+        path = 'hedge' if hedged else 'primary'
+        if attempt:
+            path = f"retry-{attempt}:{path}"
+
+        return CallOutcome(result=result, path=path, attempts=attempt + 1, elapsed=loop.time() - started)
+
+    if last_error is None or isinstance(last_error, asyncio.TimeoutError):
+        raise asyncio.TimeoutError(f"Deadline of {policy.deadline}s exceeded.") from last_error
+
+    raise last_error
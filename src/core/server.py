@@ -0,0 +1,532 @@
+# src/core/server.py
+
+"""
+This module exposes the OCR and translation pipeline over HTTP so that several machines and
+tools can share one SnapTranslate instance. It is built on asyncio streams only.
+
+Endpoints:
+    POST /translate?target=en&source=ru   The request body is the raw image (PNG, JPEG, ...).
+                                          Returns {"text": ..., "translation": ...} as JSON, with the
+                                          similar earlier text found in the translation memory, if any.
+    GET  /health                          Liveness and queue status.
+    GET  /metrics                         Request counters and latency quantiles.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from googletrans import LANGUAGES
+from urllib.parse import urlsplit, parse_qs
+from PIL import Image, UnidentifiedImageError
+from . import processing
+from . import resilience
+from . import translator
+
+import argparse
+import asyncio
+import configparser
+import json
+import logging
+import os
+import tempfile
+import time
+
+# Configure logging to display any potential errors or warnings
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+STATUS_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    411: "Length Required",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+MAX_HEADER_SIZE = 16 * 1024    # Upper bound of the request line and headers together, in bytes
+READ_CHUNK_SIZE = 64 * 1024    # The request body is streamed to disk in chunks of this size
+
+class HTTPError(Exception):
+    """
+    Raised while handling a request to answer it with the given status code.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+@dataclass
+class ServerConfig:
+    """
+    Settings of the HTTP server.
+    """
+
+    host: str = '127.0.0.1'
+    port: int = 8765
+    queue_size: int = 16            # Jobs that may wait for a worker before new requests get 429
+    workers: int = 4                # Jobs processed concurrently (OCR and translation)
+    ocr_workers: int = field(default_factory=lambda: os.cpu_count() or 2)   # Threads running Tesseract
+    max_body_size: int = 32 * 1024 * 1024   # Largest accepted image upload, in bytes
+    spool_size: int = 1024 * 1024   # Uploads larger than this are spooled to a temporary file, in bytes
+    read_timeout: float = 30.0      # Time allowed for receiving one request, in seconds
+
+def load_server_config(config_path: str = 'config.ini', section: str = 'Server') -> ServerConfig:
+    """
+    Reads a ServerConfig from the given section of config.ini.
+
+    Args:
+        config_path: Path of the configuration file. Defaults to 'config.ini' in the working directory.
+        section: Name of the section holding the settings. Defaults to 'Server'.
+
+    Returns:
+        A ServerConfig. Settings missing from the file keep their default values.
+    """
+
+    server_config = ServerConfig()
+    config = configparser.ConfigParser()
+    config.read(config_path)
+
+    if section not in config:
+        return server_config
+
+    options = config[section]
+    try:
+        server_config.host = options.get('HOST', server_config.host)
+        server_config.port = options.getint('PORT', server_config.port)
+        server_config.queue_size = options.getint('QUEUE_SIZE', server_config.queue_size)
+        server_config.workers = options.getint('WORKERS', server_config.workers)
+        server_config.ocr_workers = options.getint('OCR_WORKERS', server_config.ocr_workers)
+        server_config.max_body_size = options.getint('MAX_BODY_SIZE', server_config.max_body_size)
+        server_config.spool_size = options.getint('SPOOL_SIZE', server_config.spool_size)
+        server_config.read_timeout = options.getfloat('READ_TIMEOUT', server_config.read_timeout)
+    except ValueError as e:
+        logging.warning(f"Invalid value in the [{section}] section of {config_path}: {e}. Using defaults for the rest.")
+
+    return server_config
+
+def decode_image(body) -> Image.Image:
+    """
+    Decodes an uploaded image from a file object. Runs in the OCR pool since decoding is CPU bound.
+
+    Raises HTTPError(400) if the body is not an image Pillow can read, or HTTPError(413) if it has
+    more pixels than Pillow's decompression bomb limit.
+    """
+
+    try:
+        body.seek(0)
+        image = Image.open(body)
+        image.load()    # Decode now, while the body is still open
+
+        return image
+
+    # A small file can decode into a huge image; Pillow refuses those instead of running out of memory
+    except Image.DecompressionBombError as e:
+        raise HTTPError(413, f"The image has too many pixels: {e}")
+
+    except (UnidentifiedImageError, OSError) as e:
+        raise HTTPError(400, f"The request body is not a readable image: {e}")
+
+    finally:
+        body.close()
+
+class TranslationServer:
+    """
+    An asyncio HTTP server that runs uploaded images through the OCR and translation pipeline.
+
+    Requests are put on a bounded queue served by a fixed number of workers. When the queue is
+    full, new requests are rejected with 429 instead of piling up.
+    """
+
+    def __init__(self, config: ServerConfig = None, pipeline=None):
+        """
+        Initializes the TranslationServer.
+
+        Args:
+            config: The ServerConfig to use. Defaults to the [Server] section of config.ini.
+            pipeline: The coroutine function called for each job, with the signature of
+                      processing.process_image. Defaults to processing.process_image.
+        """
+
+        self.config = config or load_server_config()
+        self.pipeline = pipeline or processing.process_image
+
+        self.executor = None    # The OCR worker pool, created in start()
+        self.queue = None       # The bounded work queue, created in start()
+        self._server = None
+        self._workers = []
+
+        self.started_at = time.monotonic()
+        self.latency = resilience.LatencyTracker(window=1000, min_samples=1)
+        self.counters = {
+            'requests_total': 0,
+            'rejected_total': 0,    # Requests answered with 429
+            'in_flight': 0,         # Jobs currently being processed by a worker
+            'responses': {},        # Responses by status code
+        }
+
+    @property
+    def port(self) -> int:
+        """
+        The port the server is listening on (useful when configured with port 0).
+        """
+
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        """
+        Starts the OCR pool, the workers and the listening socket.
+        """
+
+        self.executor = ThreadPoolExecutor(max_workers=self.config.ocr_workers, thread_name_prefix='ocr')
+        self.queue = asyncio.Queue(maxsize=self.config.queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.config.workers)]
+        self._server = await asyncio.start_server(self.handle_connection, self.config.host, self.config.port,
+                                                  limit=MAX_HEADER_SIZE)
+
+        logging.info(f"SnapTranslate server listening on http://{self.config.host}:{self.port}")
+
+    async def serve_forever(self):
+        """
+        Serves requests until cancelled.
+        """
+
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops accepting connections, stops the workers and shuts the OCR pool down.
+        """
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _worker(self):
+        """
+        Takes jobs off the queue and runs them through the pipeline.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            body, target_language, source_language, future = await self.queue.get()
+            self.counters['in_flight'] += 1
+
+            try:
+                if not future.cancelled():
+                    image = await loop.run_in_executor(self.executor, decode_image, body)
+                    result = await self.pipeline(image, target_language=target_language,
+                                                 source_language=source_language, executor=self.executor)
+                    if not future.cancelled():
+                        future.set_result(result)
+
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+
+            finally:
+                self.counters['in_flight'] -= 1
+                self.queue.task_done()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Handles one HTTP request on a new connection. Connections are closed after the response.
+        """
+
+        started = time.monotonic()
+        status, payload = 500, {"error": "Internal server error."}
+        extra_headers = {}
+
+        try:
+            method, target, headers = await asyncio.wait_for(self._read_head(reader), self.config.read_timeout)
+            self.counters['requests_total'] += 1
+            status, payload = await self._route(method, target, headers, reader)
+
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+            if status == 429:
+                self.counters['rejected_total'] += 1
+                extra_headers['Retry-After'] = '1'
+
+        except asyncio.TimeoutError:
+            status, payload = 408, {"error": "Timed out while reading the request."}
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()  # The client went away, there is nobody to answer
+            return
+
+        except Exception as e:
+            logging.error(f"An error occurred while handling a request: {e}")
+            status, payload = 500, {"error": f"Internal server error: {e}"}
+
+        self.counters['responses'][status] = self.counters['responses'].get(status, 0) + 1
+        if status == 200:
+            self.latency.record(time.monotonic() - started)
+
+        await self._write_response(writer, status, payload, extra_headers)
+
+    async def _read_head(self, reader: asyncio.StreamReader):
+        """
+        Reads and parses the request line and the headers.
+
+        Returns:
+            A tuple (method, target, headers) with the header names in lowercase.
+        """
+
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "The request headers are too large.")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        return method.upper(), target, headers
+
+    async def _route(self, method: str, target: str, headers: dict, reader: asyncio.StreamReader):
+        """
+        Dispatches a request to its endpoint.
+
+        Returns:
+            A tuple (status, payload) where payload is JSON serializable.
+        """
+
+        url = urlsplit(target)
+        routes = {
+            '/translate': ('POST', self._handle_translate),
+            '/health': ('GET', self._handle_health),
+            '/metrics': ('GET', self._handle_metrics),
+        }
+
+        if url.path not in routes:
+            raise HTTPError(404, f"No such endpoint: {url.path}")
+
+        allowed_method, handler = routes[url.path]
+        if method != allowed_method:
+            raise HTTPError(405, f"{url.path} only accepts {allowed_method} requests.")
+
+        return await handler(parse_qs(url.query), headers, reader)
+
+    async def _handle_translate(self, query: dict, headers: dict, reader: asyncio.StreamReader):
+        """
+        Handles POST /translate: streams the image in, queues the job and waits for its result.
+        """
+
+        # Reject before reading a possibly large body when there is no room for the job anyway
+        if self.queue.full():
+            raise HTTPError(429, "The server is busy. Please retry later.")
+
+        target_language = query.get('target', ['en'])[0].lower()
+        source_language = query.get('source', [None])[0]
+
+        # Reject unknown languages here: the translation service would fail on them for every attempt
+        if target_language not in LANGUAGES:
+            raise HTTPError(400, f"Unknown target language: '{target_language}'.")
+        if source_language is not None:
+            source_language = source_language.lower()
+            if source_language != 'auto' and source_language not in LANGUAGES:
+                raise HTTPError(400, f"Unknown source language: '{source_language}'.")
+
+        # A client that stops sending the body must not hold the connection forever
+        body = await asyncio.wait_for(self._read_body(headers, reader), self.config.read_timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((body, target_language, source_language, future))
+        except asyncio.QueueFull:
+            body.close()
+            raise HTTPError(429, "The server is busy. Please retry later.")
+
+        try:
+            result = await future
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        memory_match = None
+        if result.memory_match is not None:
+            # A similar text was translated before: its translation was reused, or it is only reported (ACTION = flag)
+            memory_match = {
+                "text": result.memory_match.source_text,
+                "translation": result.memory_match.translated_text,
+                "similarity": round(result.memory_match.similarity, 3),
+            }
+
+        return 200, {
+            "text": result.source_text,
+            "translation": result.translated_text,
+            "source_language": source_language,
+            "target_language": target_language,
+            "memory_match": memory_match,
+        }
+
+    async def _read_body(self, headers: dict, reader: asyncio.StreamReader):
+        """
+        Streams the request body into a spooled temporary file, so that large images do not have
+        to be held in memory twice. Supports Content-Length and chunked transfer encoding.
+
+        Returns:
+            The file object holding the body. Raises HTTPError for missing, oversized or empty bodies.
+        """
+
+        body = tempfile.SpooledTemporaryFile(max_size=self.config.spool_size)
+        received = 0
+
+        async def copy(size: int):
+            """
+            Copies exactly size bytes from the connection into the body.
+            """
+
+            nonlocal received
+            received += size
+            if received > self.config.max_body_size:
+                raise HTTPError(413, f"The image is larger than {self.config.max_body_size} bytes.")
+
+            while size > 0:
+                chunk = await reader.readexactly(min(size, READ_CHUNK_SIZE))
+                body.write(chunk)
+                size -= len(chunk)
+
+        try:
+            if headers.get('transfer-encoding', '').lower() == 'chunked':
+                while True:
+                    try:
+                        size_line = await reader.readuntil(b'\r\n')
+                        chunk_size = int(size_line.split(b';', 1)[0].strip(), 16)
+                    except (asyncio.LimitOverrunError, ValueError):
+                        raise HTTPError(400, "Malformed chunk size.")
+
+                    if chunk_size == 0:
+                        try:
+                            await reader.readuntil(b'\r\n')  # Final CRLF (trailers are not supported)
+                        except asyncio.LimitOverrunError:
+                            raise HTTPError(400, "Malformed end of the chunked body.")
+                        break
+
+                    await copy(chunk_size)
+                    await reader.readexactly(2)  # CRLF after each chunk
+
+            elif 'content-length' in headers:
+                try:
+                    content_length = int(headers['content-length'])
+                except ValueError:
+                    raise HTTPError(400, "Malformed Content-Length header.")
+
+                await copy(content_length)
+
+            else:
+                raise HTTPError(411, "A Content-Length header or chunked transfer encoding is required.")
+
+            if received == 0:
+                raise HTTPError(400, "The request body is empty.")
+
+            return body
+
+        except BaseException:
+            body.close()
+            raise
+
+    async def _handle_health(self, query: dict, headers: dict, reader: asyncio.StreamReader):
+        """
+        Handles GET /health.
+        """
+
+        return 200, {
+            "status": "ok",
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.config.queue_size,
+            "translation_circuit": translator.circuit_breaker.state,
+        }
+
+    async def _handle_metrics(self, query: dict, headers: dict, reader: asyncio.StreamReader):
+        """
+        Handles GET /metrics.
+        """
+
+        return 200, {
+            "uptime_seconds": round(time.monotonic() - self.started_at, 3),
+            "requests_total": self.counters['requests_total'],
+            "rejected_total": self.counters['rejected_total'],
+            "responses": {str(status): count for status, count in self.counters['responses'].items()},
+            "in_flight": self.counters['in_flight'],
+            "queue_depth": self.queue.qsize(),
+            "workers": self.config.workers,
+            "ocr_workers": self.config.ocr_workers,
+            "latency_p50_seconds": self.latency.quantile(0.5),
+            "latency_p95_seconds": self.latency.quantile(0.95),
+        }
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload, extra_headers: dict):
+        """
+        Writes a JSON response and closes the connection.
+        """
+
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}",
+                "Connection: close"]
+        head += [f"{name}: {value}" for name, value in extra_headers.items()]
+
+        try:
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass    # The client went away before reading the response
+        finally:
+            writer.close()
+
+async def serve(config: ServerConfig = None):
+    """
+    Runs a TranslationServer until cancelled.
+    """
+
+    server = TranslationServer(config)
+    await server.start()
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+def main():
+    """
+    Starts the server from the command line. Command line options override config.ini.
+    """
+
+    config = load_server_config()
+
+    parser = argparse.ArgumentParser(description="Serve the SnapTranslate OCR and translation pipeline over HTTP.")
+    parser.add_argument('--host', default=config.host, help="Address to listen on.")
+    parser.add_argument('--port', type=int, default=config.port, help="Port to listen on.")
+    args = parser.parse_args()
+
+    config.host, config.port = args.host, args.port
+
+    try:
+        asyncio.run(serve(config))
+    except KeyboardInterrupt:
+        logging.info("SnapTranslate server stopped.")
+
+if __name__ == '__main__':
+    main()
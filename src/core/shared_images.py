@@ -0,0 +1,326 @@
+# src/core/shared_images.py
+
+"""
+This module contains the handoff of images to OCR worker processes through shared memory.
+
+Sending a PIL image to another process pickles and copies all of its pixels, several times
+for a large screen capture. Here the pixels are written once into a shared memory block taken
+from a reusable pool, and the worker only receives a small ImageDescriptor (block name, offset,
+size, mode and stride) from which it maps the pixels without copying them.
+
+Images are shared in grayscale, one byte per pixel: Tesseract converts its input to grayscale
+anyway, and it is the smallest layout a worker can map without copying.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from PIL import Image
+
+import asyncio
+import configparser
+import logging
+import multiprocessing
+import os
+import threading
+
+# Configure logging to display any potential errors or warnings
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MIN_BLOCK_SIZE = 1 << 20    # Smallest shared memory block (1 MiB). Larger blocks are powers of two.
+STRIP_ROWS = 64             # Rows converted at a time when writing an image, bounding temporary copies
+
+def get_ocr_processes():    # Find the number of OCR worker processes from config.ini file
+    config = configparser.ConfigParser()
+    config.read('config.ini')  # Assuming config.ini is in the root directory
+
+    try:
+        return max(0, config.getint('Tesseract', 'OCR_PROCESSES', fallback=0))
+    except ValueError:
+        logging.warning("OCR_PROCESSES in config.ini is not a whole number. Running OCR in the application process.")
+        return 0
+
+@dataclass(frozen=True)
+class ImageDescriptor:
+    """
+    Describes where an image lies in a shared memory block. Small enough to send to another process.
+    """
+
+    name: str       # Name of the shared memory block
+    offset: int     # Byte offset of the first row in the block
+    width: int
+    height: int
+    mode: str       # Pillow mode of the pixels, 'L' (one byte per pixel)
+    stride: int     # Bytes from the start of one row to the start of the next
+
+    def rows(self, top: int, bottom: int) -> 'ImageDescriptor':
+        """
+        Returns the descriptor of the full-width band between rows top and bottom, sharing the same pixels.
+        """
+
+        return replace(self, offset=self.offset + top * self.stride, height=bottom - top)
+
+def block_size_for(size: int) -> int:
+    """
+    Returns the size class of a request: the smallest power of two of at least MIN_BLOCK_SIZE
+    that fits size bytes. Rounding up lets captures of slightly different sizes reuse a block.
+    """
+
+    block_size = MIN_BLOCK_SIZE
+    while block_size < size:
+        block_size *= 2
+
+    return block_size
+
+class SharedImagePool:
+    """
+    A pool of shared memory blocks reused between captures, so that no block is created or
+    destroyed per capture once the pool is warm. Thread-safe.
+    """
+
+    def __init__(self, max_idle_blocks: int = 4):
+        """
+        Initializes the SharedImagePool.
+
+        Args:
+            max_idle_blocks: The maximum number of unused blocks kept for reuse. Blocks released
+                             beyond this are destroyed.
+        """
+
+        self.max_idle_blocks = max_idle_blocks
+        self._idle = {}     # Size class -> list of unused blocks
+        self._idle_count = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def acquire(self, size: int) -> shared_memory.SharedMemory:
+        """
+        Returns a block of at least size bytes, reusing an idle block when one is large enough.
+        """
+
+        block_size = block_size_for(size)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The shared image pool is closed.")
+
+            idle = self._idle.get(block_size)
+            if idle:
+                block = idle.pop()
+                self._idle_count -= 1
+            else:
+                block = shared_memory.SharedMemory(create=True, size=block_size)
+
+        return block
+
+    def release(self, block: shared_memory.SharedMemory):
+        """
+        Returns a block to the pool once no worker uses it anymore.
+        """
+
+        with self._lock:
+            if not self._closed and self._idle_count < self.max_idle_blocks:
+                self._idle.setdefault(block.size, []).append(block)
+                self._idle_count += 1
+                return
+
+        self._destroy(block)
+
+    def close(self):
+        """
+        Destroys the idle blocks. Blocks still in use are destroyed when they are released.
+        """
+
+        with self._lock:
+            self._closed = True
+            blocks = [block for idle in self._idle.values() for block in idle]
+            self._idle.clear()
+            self._idle_count = 0
+
+        for block in blocks:
+            self._destroy(block)
+
+    @staticmethod
+    def _destroy(block: shared_memory.SharedMemory):
+        """
+        Closes a block and removes it from the system.
+        """
+
+        try:
+            block.close()
+            block.unlink()
+        except (BufferError, FileNotFoundError) as e:
+            logging.warning(f"Could not remove shared memory block {block.name}: {e}")
+
+class SharedImage:
+    """
+    An image copied into a block of a SharedImagePool. The block goes back to the pool when the
+    image and every job started on it with SharedMemoryOcrPool.run have been released.
+    """
+
+    def __init__(self, pool: SharedImagePool, image: Image.Image):
+        """
+        Writes the pixels of an image into a block from the pool.
+
+        Args:
+            pool: The SharedImagePool to take the block from.
+            image: The PIL Image to share. It is stored in grayscale ('L').
+        """
+
+        mode = 'L'
+        width, height = image.size
+        stride = width
+
+        self._pool = pool
+        self._block = pool.acquire(stride * height)
+        self._references = 1
+        self._lock = threading.Lock()
+        self.descriptor = ImageDescriptor(name=self._block.name, offset=0, width=width, height=height, mode=mode, stride=stride)
+
+        try:
+            # Convert and copy a strip at a time, so that no second full-size copy of the image is made
+            for top in range(0, height, STRIP_ROWS):
+                strip = image.crop((0, top, width, min(top + STRIP_ROWS, height)))
+                if strip.mode != mode:
+                    strip = strip.convert(mode)
+
+                pixels = strip.tobytes()
+                self._block.buf[top * stride:top * stride + len(pixels)] = pixels
+
+        except Exception:
+            self.release()
+            raise
+
+    def retain(self):
+        """
+        Adds a reference, held by a job that reads the image.
+        """
+
+        with self._lock:
+            self._references += 1
+
+    def release(self):
+        """
+        Drops a reference. The block returns to the pool with the last one.
+        """
+
+        with self._lock:
+            self._references -= 1
+            if self._references > 0:
+                return
+
+        self._pool.release(self._block)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+def open_shared_image(descriptor: ImageDescriptor, buffer) -> Image.Image:
+    """
+    Maps the image described by a descriptor onto a buffer holding the block, without copying pixels.
+    The image must be discarded before the buffer is released.
+    """
+
+    view = buffer[descriptor.offset:descriptor.offset + descriptor.stride * descriptor.height]
+
+    return Image.frombuffer(descriptor.mode, (descriptor.width, descriptor.height), view,
+                            'raw', descriptor.mode, descriptor.stride, 1)
+
+def run_on_shared_image(function, descriptor: ImageDescriptor, kwargs: dict):
+    """
+    Runs in a worker process: attaches to the block of a descriptor, maps the image and calls
+    function(image, **kwargs) on it.
+    """
+
+    block = shared_memory.SharedMemory(name=descriptor.name)
+    try:
+        image = open_shared_image(descriptor, block.buf)
+        try:
+            return function(image, **kwargs)
+        finally:
+            del image   # Drops the export of the block's buffer, so that the block can be closed
+
+    finally:
+        try:
+            block.close()
+        except BufferError:
+            pass    # A traceback still holds the image; the mapping is closed when it is collected
+
+class SharedMemoryOcrPool:
+    """
+    A pool of OCR worker processes fed through shared memory.
+
+    It can be passed as the executor of the functions in the processing module, which then send
+    images to the workers as ImageDescriptors instead of pickled pixels.
+    """
+
+    def __init__(self, max_workers: int = None, max_idle_blocks: int = None):
+        """
+        Starts the worker processes.
+
+        Args:
+            max_workers: The number of worker processes. Defaults to the number of CPUs.
+            max_idle_blocks: The number of unused shared memory blocks kept for reuse.
+                             Defaults to twice the number of workers.
+        """
+
+        max_workers = max_workers or os.cpu_count() or 1
+        # Start the workers fresh rather than forking: the application runs threads (the Qt event loop, the
+        # history writer), and a child forked while another thread holds a lock can deadlock on it
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        self.images = SharedImagePool(max_idle_blocks if max_idle_blocks is not None else 2 * max_workers)
+
+    def share(self, image: Image.Image) -> SharedImage:
+        """
+        Copies an image into shared memory, so that several jobs (e.g. one per text block) can read it.
+        Release the returned SharedImage, or use it as a context manager, when done starting jobs.
+        """
+
+        return SharedImage(self.images, image)
+
+    async def run(self, function, image, region: tuple = None, **kwargs):
+        """
+        Runs function(image, **kwargs) in a worker process.
+
+        Args:
+            function: A module-level function taking a grayscale PIL Image, e.g. processing.recognize_text.
+            image: A PIL Image, which is shared for this job only, or a SharedImage from share().
+            region: An optional (top, bottom) pair restricting the job to a band of full-width rows.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            The return value of the function.
+        """
+
+        shared = image if isinstance(image, SharedImage) else self.share(image)
+        if shared is image:
+            shared.retain()     # This job's reference; the caller keeps its own
+
+        descriptor = shared.descriptor if region is None else shared.descriptor.rows(*region)
+
+        try:
+            future = self.executor.submit(run_on_shared_image, function, descriptor, kwargs)
+        except Exception:
+            shared.release()
+            raise
+
+        # Release when the worker is done with the block, even if this coroutine is cancelled before
+        future.add_done_callback(lambda _: shared.release())
+
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """
+        Stops the worker processes and removes the shared memory blocks.
+        """
+
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        self.images.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -0,0 +1,349 @@
+# src/core/translation_memory.py
+
+"""
+This module contains a fuzzy translation memory. OCR output for the same on-screen sentence often
+differs by a character or two between captures, which defeats exact caching. The memory finds
+earlier source segments that are nearly the same, using MinHash signatures of character n-grams
+and locality-sensitive hashing (LSH), so that their translations can be reused.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import configparser
+import difflib
+import logging
+import random
+import re
+import zlib
+
+# Configure logging to display any potential errors or warnings
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MIX = 0x9E3779B97F4A7C15         # Odd 64-bit constant that spreads the n-gram checksums over 64 bits
+MASK_64 = (1 << 64) - 1
+
+# Characters OCR mistakes for one another, mapped to one representative: digits and symbols that look
+# like letters, and Cyrillic letters that look like Latin ones
+CONFUSABLES = str.maketrans({
+    '0': 'o', '1': 'l', 'i': 'l', '|': 'l', '!': 'l', '5': 's', '$': 's', '8': 'b',
+    'а': 'a', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c', 'х': 'x', 'у': 'y', 'к': 'k', 'м': 'm', 'т': 't', 'н': 'h', 'в': 'b',
+})
+CONFUSABLE_PAIRS = (('rn', 'm'), ('vv', 'w'), ('cl', 'd'))
+NUMBER_PATTERN = re.compile(r'^[\d.,:/%+-]*\d[\d.,:/%+-]*$')    # A whole word made of digits, e.g. '7,250.00' or '5'
+
+# Words that turn a sentence into its opposite. A reused translation must not gain or lose one
+NEGATION_WORDS = {
+    'not', 'no', 'never', 'none', 'nothing', 'nor', 'cannot', 'without', 'don', 'doesn', 'didn', 'isn', 'aren',
+    'wasn', 'couldn', 'shouldn', 'wouldn', 'haven', 'hasn',                 # English, also the first halves of "don't" etc.
+    'не', 'нет', 'ни', 'без', 'никогда', 'ничего',                         # Russian
+    'nicht', 'kein', 'keine', 'keinen', 'keinem', 'keiner', 'nie', 'niemals', 'ohne',  # German
+    'ne', 'pas', 'non', 'jamais', 'sans', 'aucun', 'aucune',                # French
+    'nunca', 'sin', 'nada', 'nem', 'sem', 'mai', 'senza', 'inte', 'ej', 'aldrig', 'utan',   # Spanish, Portuguese, Italian, Swedish
+}
+
+@dataclass
+class MemoryConfig:
+    """
+    Settings of the translation memory.
+    """
+
+    enabled: bool = True
+    max_entries: int = 100000   # The least recently used segments are evicted beyond this (about 1 KB each)
+    threshold: float = 0.8      # Minimum n-gram (Jaccard) similarity of a match, between 0 and 1
+    action: str = 'reuse'       # 'reuse' the matched translation, or only 'flag' the match and translate anyway
+
+@dataclass
+class MemoryMatch:
+    """
+    An earlier segment similar to the one looked up.
+    """
+
+    source_text: str
+    translated_text: str
+    similarity: float
+
+def load_memory_config(config_path: str = 'config.ini', section: str = 'TranslationMemory') -> MemoryConfig:
+    """
+    Reads a MemoryConfig from the given section of config.ini.
+
+    Args:
+        config_path: Path of the configuration file. Defaults to 'config.ini' in the working directory.
+        section: Name of the section holding the settings. Defaults to 'TranslationMemory'.
+
+    Returns:
+        A MemoryConfig. Settings missing from the file keep their default values.
+    """
+
+    memory_config = MemoryConfig()
+    config = configparser.ConfigParser()
+    config.read(config_path)
+
+    if section not in config:
+        return memory_config
+
+    options = config[section]
+    try:
+        memory_config.enabled = options.getboolean('ENABLED', memory_config.enabled)
+        memory_config.max_entries = options.getint('MAX_ENTRIES', memory_config.max_entries)
+        memory_config.threshold = options.getfloat('THRESHOLD', memory_config.threshold)
+        memory_config.action = options.get('ACTION', memory_config.action).strip().lower()
+    except ValueError as e:
+        logging.warning(f"Invalid value in the [{section}] section of {config_path}: {e}. Using defaults for the rest.")
+
+    if memory_config.action not in ('reuse', 'flag'):
+        logging.warning(f"Unknown ACTION '{memory_config.action}' in the [{section}] section of {config_path}. Using 'reuse'.")
+        memory_config.action = 'reuse'
+
+    return memory_config
+
+def normalize_segment(text: str) -> str:
+    """
+    Returns the text in lowercase with runs of whitespace collapsed to single spaces.
+    """
+
+    return " ".join(text.casefold().split())
+
+def ngrams(text: str, size: int = 3) -> set:
+    """
+    Returns the set of character n-grams of a normalized text. Texts shorter than size are one n-gram.
+    """
+
+    if len(text) <= size:
+        return {text}
+
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+def fold_confusables(text: str) -> str:
+    """
+    Replaces the characters OCR confuses with one representative, so that OCR errors do not lower similarity.
+    """
+
+    return text.translate(CONFUSABLES)
+
+def content_key(text: str) -> str:
+    """
+    Returns the letters and digits of a normalized text with OCR-confusable characters made equal,
+    so that texts differing only by OCR errors, punctuation or spacing have the same key.
+    """
+
+    for pair, replacement in CONFUSABLE_PAIRS:
+        text = text.replace(pair, replacement)
+
+    return re.sub(r'[\W_]+', '', fold_confusables(text))
+
+def numbers(text: str) -> list:
+    """
+    Returns the words of a normalized text that are numbers, in order.
+    """
+
+    return [word for word in text.split() if NUMBER_PATTERN.match(word.strip('()[]'))]
+
+def edit_distance(first: str, second: str) -> int:
+    """
+    Returns the Levenshtein distance of two strings: the number of characters inserted, removed or replaced.
+    """
+
+    previous = list(range(len(second) + 1))
+    for index, character in enumerate(first, 1):
+        current = [index]
+        for other_index, other_character in enumerate(second, 1):
+            current.append(min(previous[other_index] + 1, current[-1] + 1,
+                               previous[other_index - 1] + (character != other_character)))
+        previous = current
+
+    return previous[-1]
+
+def same_content(first: str, second: str) -> bool:
+    """
+    Returns True if two normalized texts can be the same text read twice by OCR: their numbers are
+    identical, no word is missing or added, no negation differs, and the words that differ are at
+    most one character off per four letters ('windw' for 'window', 'chanqes' for 'changes'), after
+    OCR-confusable characters are made equal. Similar texts that say something else ('Do not delete'
+    and 'Do delete', '3 new messages' and '5 new messages', 'on' and 'of') are not.
+    """
+
+    if numbers(first) != numbers(second):
+        return False
+
+    first_words, second_words = re.findall(r'\w+', first), re.findall(r'\w+', second)
+    first_keys, second_keys = [content_key(word) for word in first_words], [content_key(word) for word in second_words]
+
+    matcher = difflib.SequenceMatcher(None, first_keys, second_keys, autojunk=False)
+    for operation, first_start, first_end, second_start, second_end in matcher.get_opcodes():
+        if operation == 'equal':
+            continue
+        if operation != 'replace':
+            return False    # A word was dropped or added
+
+        if NEGATION_WORDS & set(first_words[first_start:first_end]) != NEGATION_WORDS & set(second_words[second_start:second_end]):
+            return False
+
+        # Words split or joined by OCR are compared as one string
+        first_part, second_part = "".join(first_keys[first_start:first_end]), "".join(second_keys[second_start:second_end])
+        if edit_distance(first_part, second_part) > max(len(first_part), len(second_part)) // 4:
+            return False
+
+    return True
+
+def jaccard_similarity(first: set, second: set) -> float:
+    """
+    Returns the Jaccard similarity (shared / all elements) of two sets.
+    """
+
+    if not first and not second:
+        return 1.0
+
+    return len(first & second) / len(first | second)
+
+class TranslationMemory:
+    """
+    A bounded memory of translated segments with approximate lookup.
+
+    Every segment gets a MinHash signature of its character n-grams, split into bands. Segments that
+    share a band with the query are candidates, and candidates are checked with the exact Jaccard
+    similarity, so a lookup only looks at a handful of segments however large the memory is.
+    """
+
+    def __init__(self, max_entries: int = 100000, threshold: float = 0.8, ngram_size: int = 3,
+                 bands: int = 8, rows_per_band: int = 4, seed: int = 47):
+        """
+        Initializes the TranslationMemory.
+
+        Args:
+            max_entries: The maximum number of segments kept. The least recently used are evicted first.
+            threshold: Minimum Jaccard similarity of a match, between 0 and 1.
+            ngram_size: Length of the character n-grams compared.
+            bands: Number of LSH bands. More bands find more distant matches but check more candidates.
+            rows_per_band: MinHash values per band. More rows make each band more selective.
+            seed: Seed of the hash functions, so that signatures are reproducible.
+        """
+
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+
+        rng = random.Random(seed)
+        self.hash_masks = [rng.getrandbits(64) for _ in range(bands * rows_per_band)]   # One hash function per mask
+
+        self.entries = OrderedDict()    # (normalized source, src_lang, dest_lang) -> (source text, translation, band keys)
+        self.buckets = {}               # band key -> entry key, or a set of entry keys when several share the band
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _band_keys(self, grams: set, src_lang: str, dest_lang: str) -> tuple:
+        """
+        Computes the MinHash signature of a set of n-grams and returns one integer bucket key per band.
+        """
+
+        values = [(zlib.crc32(gram.encode('utf-8')) * MIX) & MASK_64 for gram in grams]
+        signature = [min([value ^ mask for value in values]) for mask in self.hash_masks]
+
+        rows = self.rows_per_band
+        return tuple(hash((src_lang, dest_lang, band, *signature[band * rows:(band + 1) * rows])) for band in range(self.bands))
+
+    def add(self, source_text: str, src_lang: str, dest_lang: str, translated_text: str):
+        """
+        Stores a translated segment, evicting the least recently used one when the memory is full.
+        """
+
+        if self.max_entries <= 0:
+            return
+
+        normalized = normalize_segment(source_text)
+        if not normalized:
+            return
+
+        key = (normalized, src_lang, dest_lang)
+        if key in self.entries:
+            self._remove(key)
+
+        band_keys = self._band_keys(ngrams(fold_confusables(normalized), self.ngram_size), src_lang, dest_lang)
+        self.entries[key] = (source_text, translated_text, band_keys)
+        for band_key in band_keys:
+            bucket = self.buckets.get(band_key)
+            if bucket is None:
+                self.buckets[band_key] = key    # Most bands are unique: store the key itself rather than a set
+            elif isinstance(bucket, set):
+                bucket.add(key)
+            else:
+                self.buckets[band_key] = {bucket, key}
+
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        """
+        Removes a segment and its bucket memberships.
+        """
+
+        _, _, band_keys = self.entries.pop(key)
+
+        for band_key in band_keys:
+            bucket = self.buckets.get(band_key)
+            if bucket == key:
+                del self.buckets[band_key]
+            elif isinstance(bucket, set):
+                bucket.discard(key)
+                if len(bucket) == 1:
+                    self.buckets[band_key] = bucket.pop()
+
+    def lookup(self, source_text: str, src_lang: str, dest_lang: str, guarded: bool = True):
+        """
+        Finds the stored segment most similar to the given text, for the same language pair.
+
+        Args:
+            source_text: The text to look up.
+            src_lang: The language code of the text.
+            dest_lang: The language code of the translation.
+            guarded: Only match segments that can be the same text read with OCR errors (see same_content),
+                     so that their translation is safe to reuse. Defaults to True.
+
+        Returns:
+            A MemoryMatch with a similarity of at least the threshold, or None.
+        """
+
+        normalized = normalize_segment(source_text)
+        if not normalized:
+            return None
+
+        # An exact match (after normalization) needs no hashing
+        key = (normalized, src_lang, dest_lang)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            stored_source, translated_text, _ = self.entries[key]
+            return MemoryMatch(source_text=stored_source, translated_text=translated_text, similarity=1.0)
+
+        grams = ngrams(fold_confusables(normalized), self.ngram_size)
+        candidates = set()
+        for band_key in self._band_keys(grams, src_lang, dest_lang):
+            bucket = self.buckets.get(band_key)
+            if isinstance(bucket, set):
+                candidates |= bucket
+            elif bucket is not None:
+                candidates.add(bucket)
+
+        best_key, best_similarity = None, self.threshold
+        for candidate in candidates:
+            similarity = jaccard_similarity(grams, ngrams(fold_confusables(candidate[0]), self.ngram_size))
+            if similarity >= best_similarity and (not guarded or same_content(normalized, candidate[0])):
+                best_key, best_similarity = candidate, similarity
+
+        if best_key is None:
+            return None
+
+        self.entries.move_to_end(best_key)
+        stored_source, translated_text, _ = self.entries[best_key]
+
+        return MemoryMatch(source_text=stored_source, translated_text=translated_text, similarity=best_similarity)
+
+    def clear(self):
+        """
+        Removes all segments.
+        """
+
+        self.entries.clear()
+        self.buckets.clear()
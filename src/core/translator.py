@@ -4,65 +4,293 @@
 This module contains the functionality for translating text using the googletrans library (async).
 """
 
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from googletrans import Translator
+from . import glossary
+from . import resilience
+from . import translation_memory
 
 import logging
 import asyncio
+import configparser
+import dataclasses
 import requests
 import httpx
 
 # Configure logging to display any potential errors or warnings
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-async def translate_text(text: str, src_lang: str = 'ru', dest_lang: str = 'en') -> str:
+# Tail-latency controls shared by every translation request, configured in the [Translation] section of config.ini
+policy = resilience.load_policy()
+circuit_breaker = resilience.CircuitBreaker(policy.breaker_threshold, policy.breaker_reset_timeout)
+latency_tracker = resilience.LatencyTracker()
+
+# Errors worth retrying: the request may succeed if it is simply sent again
+TRANSIENT_ERRORS = (asyncio.TimeoutError, httpx.TransportError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+NETWORK_ERROR_MESSAGE = "Translation Error: A network error has occurred. Please check your internet connection."
+
+# The Translator (and with it the HTTP connection pool) shared by the requests inside a translation_session()
+_session_translator = ContextVar('session_translator', default=None)
+
+def get_cache_size() -> int:    # Find the cache size from config.ini file
+    config = configparser.ConfigParser()
+    config.read('config.ini')  # Assuming config.ini is in the root directory
+
+    try:
+        return config.getint('Translation', 'CACHE_SIZE', fallback=1024)
+    except ValueError:
+        logging.warning("Invalid CACHE_SIZE in config.ini. Using default: 1024")
+
+        return 1024
+
+class TranslationCache:
     """
-    Translates the given text from the source language to the destination language
-    using the Google Translate API via the googletrans library (async).
+    A bounded cache of successful translations. The least recently used entry is evicted first.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initializes the TranslationCache.
+
+        Args:
+            max_entries: The maximum number of translations kept. 0 disables the cache.
+        """
+
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, text: str, src_lang: str, dest_lang: str):
+        """
+        Returns the cached translation, or None if there is none.
+        """
+
+        key = (text, src_lang, dest_lang)
+        translated = self.entries.get(key)
+
+        if translated is not None:
+            self.entries.move_to_end(key)  # Mark as most recently used
+
+        return translated
+
+    def put(self, text: str, src_lang: str, dest_lang: str, translated: str):
+        """
+        Stores a translation, evicting the least recently used one when the cache is full.
+        """
+
+        if self.max_entries <= 0:
+            return
+
+        self.entries[(text, src_lang, dest_lang)] = translated
+        self.entries.move_to_end((text, src_lang, dest_lang))
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all cached translations.
+        """
+
+        self.entries.clear()
+
+# Translations shared by every caller, so repeated captures of the same text skip the network
+cache = TranslationCache(get_cache_size())
+
+# Earlier translations of nearly identical text, configured in the [TranslationMemory] section of config.ini
+memory_config = translation_memory.load_memory_config()
+memory = translation_memory.TranslationMemory(max_entries=memory_config.max_entries if memory_config.enabled else 0,
+                                              threshold=memory_config.threshold)
+
+# User glossaries by (source language, target language), from the directory set in the [Glossary] section of config.ini
+glossaries = glossary.load_glossaries(glossary.get_glossary_directory())
+
+@asynccontextmanager
+async def translation_session():
+    """
+    Shares one Translator, and therefore one HTTP connection pool, between all translation
+    requests made inside the block, including those made by tasks created inside it.
+
+    Example:
+        async with translation_session():
+            await asyncio.gather(translate_text(text, 'ru', 'en'), translate_text(text, 'ru', 'de'))
+    """
+
+    if _session_translator.get() is not None:
+        yield   # Already inside a session, keep using its Translator
+        return
+
+    async with Translator() as translator:
+        token = _session_translator.set(translator)
+        try:
+            yield
+        finally:
+            _session_translator.reset(token)
+
+@dataclass
+class TranslationResult:
+    """
+    A translated text together with the path that served it.
+    """
+
+    text: str
+    served_by: str      # e.g. 'primary', 'hedge', 'retry-1:primary', 'glossary', 'cache', 'memory', 'empty', 'timeout', 'circuit-open', 'error'
+    attempts: int = 0
+    elapsed: float = 0.0
+    memory_match: translation_memory.MemoryMatch = None  # A similar earlier segment, reused or only flagged
+
+async def translate_text_detailed(text: str, src_lang: str = 'ru', dest_lang: str = 'en') -> TranslationResult:
+    """
+    Translates the given text like translate_text, and reports which path served the request.
+
+    Every request runs under the module's resilience policy: a per-request deadline, bounded retries
+    with jittered backoff for transient errors, optional hedged requests and a circuit breaker that
+    fails fast while the backend is down. Before any request is sent, the user's glossary, the
+    translation cache and the translation memory are consulted, in that order.
 
     Args:
         text: The string of text to be translated.
-        src_lang: The ISO 639-1 code of the source language (e.g., 'ru' for Russian).
-                    Defaults to 'ru' (Russian).
-        dest_lang: The ISO 639-1 code of the destination language (e.g., 'en' for English).
-                    Defaults to 'en' (English).
+        src_lang: The ISO 639-1 code of the source language. Defaults to 'ru' (Russian).
+                  None or 'auto' detects the language.
+        dest_lang: The ISO 639-1 code of the destination language. Defaults to 'en' (English).
 
     Returns:
-        A string containing the translated text. Returns an empty string if the input
-        text is empty. Returns an error message if an error occurs during translation.
+        A TranslationResult. On failure its text is an error message, as returned by translate_text.
     """
 
     # Check if the input text is empty or contains only whitespace
     if not text.strip():
-        return ""
+        return TranslationResult(text="", served_by='empty')
+
+    # googletrans detects the language when asked for 'auto'; None fails inside the library
+    src_lang = src_lang or 'auto'
+
+    # Short strings such as labels are answered from the user's glossary, without the network
+    term_glossary = glossaries.get((src_lang, dest_lang))
+    if term_glossary is not None and len(text.split()) <= term_glossary.max_words:
+        glossary_translation = term_glossary.lookup(text)
+        if glossary_translation is not None:
+            return TranslationResult(text=glossary_translation, served_by='glossary')
+
+    # Reuse an earlier translation of the same text
+    cached = cache.get(text, src_lang, dest_lang)
+    if cached is not None:
+        return TranslationResult(text=cached, served_by='cache')
+
+    # Reuse (or flag) the translation of a nearly identical earlier segment, e.g. the same sentence with an OCR error
+    # Only a translation that is reused must be guarded against near matches that say something else
+    memory_match = memory.lookup(text, src_lang, dest_lang, guarded=memory_config.action == 'reuse')
+    if memory_match is not None:
+        logging.info(f"Translation memory match with similarity {memory_match.similarity:.2f}: '{memory_match.source_text}'")
+
+        if memory_config.action == 'reuse':
+            return TranslationResult(text=memory_match.translated_text, served_by='memory', memory_match=memory_match)
+
+    async def request_translation(request_text: str):
+        """
+        Sends one translation request. Called again for every retry and hedge.
+        """
+
+        shared_translator = _session_translator.get()
+        if shared_translator is not None:
+            translation = await shared_translator.translate(request_text, src=src_lang, dest=dest_lang)
 
-    # Create an asynchronous Translator instance to interact with the Google Translate API
-    async with Translator() as translator:
-        try:
-            # Perform the translation asynchronously
-            translation = await translator.translate(text, src=src_lang, dest=dest_lang)
-            
             return translation.text
 
-        # Catch specific httpx.ConnectError for network connection issues (like no internet)
-        except httpx.ConnectError as e:
-            error_message = f"Translation network error (httpx): {e}"
-            logging.error(error_message)
+        # Create an asynchronous Translator instance to interact with the Google Translate API
+        async with Translator() as translator:
+            translation = await translator.translate(request_text, src=src_lang, dest=dest_lang)
+
+            return translation.text
+
+    # Keep the user's terminology: glossary terms are sent as placeholders and replaced by their glossary translations afterwards
+    protected_text, term_translations = glossary.protect_terms(text, term_glossary) if term_glossary is not None else (text, [])
+
+    try:
+        outcome = await resilience.call_with_policy(lambda: request_translation(protected_text), policy, breaker=circuit_breaker,
+                                                    tracker=latency_tracker, transient_errors=TRANSIENT_ERRORS)
+        translated_text = outcome.result
+
+        if term_translations:
+            translated_text = glossary.restore_terms(outcome.result, term_translations)
+
+            if translated_text is None:
+                # Both requests share the per-request deadline: the second one only gets what the first one left
+                remaining = policy.deadline - outcome.elapsed
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Deadline of {policy.deadline}s exceeded.")
+
+                logging.warning("The translation service dropped glossary placeholders. Translating again without them.")
+                first_outcome = outcome
+                outcome = await resilience.call_with_policy(lambda: request_translation(text), dataclasses.replace(policy, deadline=remaining),
+                                                            breaker=circuit_breaker, tracker=latency_tracker, transient_errors=TRANSIENT_ERRORS)
+                outcome.attempts += first_outcome.attempts
+                outcome.elapsed += first_outcome.elapsed
+                translated_text = outcome.result
+
+        logging.info(f"Translation served by '{outcome.path}' after {outcome.attempts} attempt(s) in {outcome.elapsed:.2f}s")
+        cache.put(text, src_lang, dest_lang, translated_text)
+        memory.add(text, src_lang, dest_lang, translated_text)
+
+        return TranslationResult(text=translated_text, served_by=outcome.path, attempts=outcome.attempts, elapsed=outcome.elapsed,
+                                 memory_match=memory_match)
+
+    # The backend failed repeatedly, do not wait for it
+    except resilience.CircuitOpenError as e:
+        logging.error(f"Translation skipped: {e}")
+
+        return TranslationResult(text="Translation Error: The translation service is unavailable. Please try again later.", served_by='circuit-open')
 
-            return "Translation Error: A network error has occurred. Please check your internet connection."
+    # The per-request deadline was exceeded
+    except asyncio.TimeoutError as e:
+        logging.error(f"Translation timed out: {e}")
 
-        # Catch requests.exceptions.RequestException for other potential network-related errors
-        except requests.exceptions.RequestException as e:
-            error_message = f"Translation network error (requests): {e}"
-            logging.error(error_message)
+        return TranslationResult(text="Translation Error: The translation request timed out.", served_by='timeout')
 
-            return "Translation Error: A network error has occurred. Please check your internet connection."
+    # Catch specific httpx.ConnectError for network connection issues (like no internet)
+    except httpx.ConnectError as e:
+        error_message = f"Translation network error (httpx): {e}"
+        logging.error(error_message)
+
+        return TranslationResult(text=NETWORK_ERROR_MESSAGE, served_by='error')
+
+    # Catch requests.exceptions.RequestException for other potential network-related errors
+    except requests.exceptions.RequestException as e:
+        error_message = f"Translation network error (requests): {e}"
+        logging.error(error_message)
+
+        return TranslationResult(text=NETWORK_ERROR_MESSAGE, served_by='error')
+
+    # Catch any other unexpected exceptions that might occur during translation
+    except Exception as e:
+        error_message = f"An unexpected translation error occurred: {e}"
+        logging.error(error_message)
+
+        return TranslationResult(text=f"Translation Error: {error_message}", served_by='error')
+
+async def translate_text(text: str, src_lang: str = 'ru', dest_lang: str = 'en') -> str:
+    """
+    Translates the given text from the source language to the destination language
+    using the Google Translate API via the googletrans library (async).
+
+    Args:
+        text: The string of text to be translated.
+        src_lang: The ISO 639-1 code of the source language (e.g., 'ru' for Russian).
+                    Defaults to 'ru' (Russian).
+        dest_lang: The ISO 639-1 code of the destination language (e.g., 'en' for English).
+                    Defaults to 'en' (English).
+
+    Returns:
+        A string containing the translated text. Returns an empty string if the input
+        text is empty. Returns an error message if an error occurs during translation.
+    """
 
-        # Catch any other unexpected exceptions that might occur during translation
-        except Exception as e:
-            error_message = f"An unexpected translation error occurred: {e}"
-            logging.error(error_message)
+    result = await translate_text_detailed(text, src_lang=src_lang, dest_lang=dest_lang)
 
-            return f"Translation Error: {error_message}"
+    return result.text
 
 if __name__ == '__main__':
     # This block will only run if this script is executed directly (not imported)
@@ -9,12 +9,14 @@ translation results.
 import sys
 import asyncio
 
-from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel
+from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, QLineEdit, QListWidget, QListWidgetItem
 from PyQt5.QtCore import Qt, QRect, QPoint, pyqtSignal
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor
 from PIL import Image
 from PyQt5.QtGui import QImage
 from core import processing
+from core import history
+from core import shared_images
 
 class ScreenCaptureWidget(QWidget):
     """
@@ -133,8 +135,16 @@ class MainWindow(QMainWindow):
         self.translate_swedish_button.clicked.connect(lambda: self.translate("sv")) # Connect the button's clicked signal to the translate method, passing the Swedish language code ("sv")
         self.buttons_layout.addWidget(self.translate_swedish_button)  # Add the "Translate Swedish" button to the buttons layout
 
+        self.history_button = QPushButton("History")  # Create the "History" button
+        self.history_button.clicked.connect(self.toggle_history_panel)  # Connect the button's clicked signal to the toggle_history_panel method
+        self.buttons_layout.addWidget(self.history_button)  # Add the "History" button to the buttons layout
+
         self.main_layout.addLayout(self.buttons_layout)  # Add the buttons layout to the main layout
 
+        self.target_languages_input = QLineEdit("en")  # Target languages, separated by commas (e.g. "en, de")
+        self.target_languages_input.setToolTip("Target languages, separated by commas (e.g. en, de)")
+        self.main_layout.addWidget(self.target_languages_input)  # Add the target languages input to the main layout
+
         self.dark_theme_enabled = True  # Flag to enable or disable dark theme       
         if self.dark_theme_enabled:
             self.apply_dark_theme()  # Apply the dark theme if enabled
@@ -144,6 +154,19 @@ class MainWindow(QMainWindow):
         self.captured_label = None  # Label to display the captured image
         self.translation_label = None # Label to display the translated text
 
+        # Local history of captures, written in the background (None if disabled in config.ini)
+        history_config = history.load_history_config()
+        self.history_store = history.HistoryStore(history_config) if history_config.enabled else None
+        self.history_panel = None # Search field and result list, created the first time the history is opened
+        self.history_button.setEnabled(self.history_store is not None)
+
+        # OCR worker processes fed through shared memory (None runs OCR in this process, as set in config.ini)
+        ocr_processes = shared_images.get_ocr_processes()
+        self.ocr_pool = shared_images.SharedMemoryOcrPool(max_workers=ocr_processes) if ocr_processes > 0 else None
+
+        self.translating = False  # True while a translation runs, during which the controls are disabled
+        self.close_requested = False  # Set when the window is closed during a translation, which then closes it
+
         # Initialize asyncio event loop
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
@@ -219,27 +242,193 @@ class MainWindow(QMainWindow):
         Initiates the translation process for the captured image.
         """
 
+        if self.translating:
+            return  # The display is repainted during a translation; ignore clicks that slipped through
+
         if self.captured_image_data is not None:
             pil_image = self.qpixmap_to_pil_image(self.captured_image_data) # Convert the captured QPixmap to a PIL Image
 
+            target_languages = self.get_target_languages() # Read the target languages from the input field
+
             async def translate_text():
                 """
                 An inner asynchronous function to perform the translation.
                 """
 
                 try:
-                    translated_text = await processing.process_image_and_translate(pil_image, target_language='en', source_language=source_language) # Call the processing module to perform OCR and translation
-                    self.display_translation(translated_text) # Display the translated text in the GUI
+                    if len(target_languages) == 1:
+                        image_hash = None
+
+                        # An identical capture was translated before: show the stored translation instead of recomputing it
+                        if self.history_store is not None:
+                            image_hash, entry = await asyncio.to_thread(self.find_in_history, pil_image, source_language, target_languages[0])
+                            if entry is not None:
+                                self.display_translation(entry.translated_text)
+                                return
+
+                        source_blocks, translated_blocks = [], []
+
+                        # Call the processing module to perform OCR and translation block by block, showing each block as soon as it is translated
+                        async for result in processing.stream_image_and_translate(pil_image, target_language=target_languages[0], source_language=source_language, executor=self.ocr_pool):
+                            source_blocks.append(result.source_text)
+                            translated_blocks.append(result.translated_text)
+                            self.display_translation("\n\n".join(translated_blocks)) # Display the translated text in the GUI
+                            QApplication.processEvents() # Repaint before the next block arrives
+
+                        self.save_to_history(pil_image, image_hash, "\n\n".join(source_blocks), "\n\n".join(translated_blocks), source_language, target_languages[0])
+                    else:
+                        translations = {}
+
+                        # OCR once, then show each translation as soon as it arrives, in the order the languages were entered
+                        async for target_language, result in processing.process_image_and_translate_many(pil_image, target_languages, source_language=source_language, executor=self.ocr_pool):
+                            translations[target_language] = result.translated_text
+                            self.display_translation("\n\n".join(f"[{language}] {translations[language]}" for language in target_languages if language in translations))
+                            QApplication.processEvents() # Repaint before the next translation arrives
+
+                            self.save_to_history(pil_image, None, result.source_text, result.translated_text, source_language, target_language) # Hashed once on the writer thread
 
                 except Exception as e:
                     error_message = f"An error occurred during translation: {str(e)}"
                     print(error_message)
                     self.display_translation(f"Translation Error: {error_message}") # Display a user-friendly error message
 
-            asyncio.run(translate_text()) # Run the asynchronous translation function in the event loop
+            # Results are shown while they arrive, which lets Qt handle events during the translation:
+            # disable everything that would start another one or tear down what this one uses
+            self.translating = True
+            self.set_controls_enabled(False)
+            try:
+                asyncio.run(translate_text()) # Run the asynchronous translation function in the event loop
+            finally:
+                self.translating = False
+                self.set_controls_enabled(True)
+
+            if self.close_requested:
+                self.close() # The window was closed during the translation
         else:
             self.display_translation("Please capture an image first.") # Display a message if no image has been captured
 
+    def find_in_history(self, pil_image, source_language, target_language):
+        """
+        Hashes the captured image and looks for an earlier translation of it. Runs on a worker thread, off the UI thread.
+
+        Returns:
+            A tuple (image_hash, HistoryEntry or None).
+        """
+
+        image_hash = history.hash_image(pil_image)
+
+        return image_hash, self.history_store.find_by_image(image_hash, source_language, target_language)
+
+    def save_to_history(self, pil_image, image_hash, source_text, translated_text, source_language, target_language):
+        """
+        Queues a finished translation for the history. Empty results and errors are not stored.
+        """
+
+        if self.history_store is None or not source_text.strip() or "Translation Error:" in translated_text:
+            return
+
+        self.history_store.add(pil_image, source_text, translated_text, source_language, target_language, image_hash=image_hash) # Written in the background
+
+    def toggle_history_panel(self):
+        """
+        Shows or hides the searchable history panel.
+        """
+
+        if self.history_panel is None:
+            self.history_panel = QWidget()
+            history_layout = QVBoxLayout(self.history_panel)
+            history_layout.setContentsMargins(0, 0, 0, 0)
+
+            self.history_search_input = QLineEdit()  # Search field, results update while typing
+            self.history_search_input.setPlaceholderText("Search history...")
+            self.history_search_input.textChanged.connect(self.search_history)
+            history_layout.addWidget(self.history_search_input)
+
+            self.history_list = QListWidget()  # Matching captures, most recent first
+            self.history_list.itemClicked.connect(self.show_history_entry)
+            history_layout.addWidget(self.history_list)
+
+            self.main_layout.addWidget(self.history_panel)  # Add the history panel to the main layout
+            self.search_history("")
+        elif self.history_panel.isVisible():
+            self.history_panel.hide()
+        else:
+            self.search_history(self.history_search_input.text()) # Refresh with captures made since it was last shown
+            self.history_panel.show()
+
+    def search_history(self, text):
+        """
+        Fills the history list with the captures matching the search text.
+        """
+
+        self.history_list.clear()
+
+        for entry in self.history_store.search(text):
+            preview = entry.translated_text.replace("\n", " ")[:80] # First part of the translation, on one line
+            item = QListWidgetItem(f"[{entry.source_language or 'auto'} → {entry.target_language}] {preview}")
+            item.setData(Qt.UserRole, entry)
+            self.history_list.addItem(item)
+
+    def show_history_entry(self, item):
+        """
+        Displays a capture from the history: its thumbnail and its translation.
+        """
+
+        entry = item.data(Qt.UserRole)
+        thumbnail = self.history_store.get_thumbnail(entry.id)
+
+        if thumbnail is not None:
+            pixmap = QPixmap()
+            pixmap.loadFromData(thumbnail) # Decode the stored JPEG thumbnail
+
+            if self.captured_label is None:
+                self.captured_label = QLabel()  # Create a label to display the captured image if it doesn't exist
+                self.main_layout.addWidget(self.captured_label)  # Add the label to the main layout
+            self.captured_label.setPixmap(pixmap.scaledToWidth(300))
+
+        self.display_translation(entry.translated_text)
+
+    def set_controls_enabled(self, enabled):
+        """
+        Enables or disables the buttons and inputs that start a capture or a translation, or change the display.
+        """
+
+        for control in (self.new_button, self.translate_russian_button, self.translate_swedish_button, self.target_languages_input):
+            control.setEnabled(enabled)
+
+        self.history_button.setEnabled(enabled and self.history_store is not None)
+        if self.history_panel is not None:
+            self.history_panel.setEnabled(enabled)
+
+    def closeEvent(self, event):
+        """
+        Writes the pending history entries and stops the OCR worker processes before the window closes.
+        While a translation runs, closing is postponed until it has finished.
+        """
+
+        if self.translating:
+            self.close_requested = True
+            event.ignore()
+            return
+
+        if self.history_store is not None:
+            self.history_store.close()
+
+        if self.ocr_pool is not None:
+            self.ocr_pool.shutdown(wait=False, cancel_futures=True)
+
+        super().closeEvent(event)
+
+    def get_target_languages(self):
+        """
+        Returns the target languages entered by the user, without duplicates. Defaults to English.
+        """
+
+        languages = [language.strip().lower() for language in self.target_languages_input.text().split(",")]
+        languages = list(dict.fromkeys(language for language in languages if language)) # Drop empty entries and duplicates
+
+        return languages or ['en']
+
     def qpixmap_to_pil_image(self, pixmap):
         """
         Converts a PyQt QPixmap to a PIL Image.
@@ -0,0 +1,150 @@
+# tests/test_documents.py
+
+"""
+This module contains unit tests for the document input layer in the src.core.documents module.
+OCR and translation are replaced by a local coroutine so that the tests do not depend on
+Tesseract or the network.
+"""
+
+import unittest
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+from unittest import mock
+from PIL import Image
+from src.core import documents
+from src.core.processing import ProcessingResult
+
+class TestDocuments(unittest.TestCase):
+    """
+    Test suite for reading and processing multi-page documents.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary directory with a five-page TIFF whose pages have different widths.
+        """
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.tiff_path = os.path.join(self.directory.name, 'document.tiff')
+
+        pages = [Image.new('RGB', (100 + page, 50), color='white') for page in range(5)]
+        pages[0].save(self.tiff_path, save_all=True, append_images=pages[1:])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_iter_pages_multipage_tiff(self):
+        """
+        Tests if every page of a multi-page TIFF is read, numbered and in order.
+        """
+
+        pages = [(page_number, image.size[0]) for page_number, image in documents.iter_pages(self.tiff_path)]
+
+        self.assertEqual(pages, [(1, 100), (2, 101), (3, 102), (4, 103), (5, 104)])
+
+    def test_iter_pages_directory_natural_order(self):
+        """
+        Tests if the images of a directory are read in natural order and other files are ignored.
+        """
+
+        image_directory = os.path.join(self.directory.name, 'scans')
+        os.mkdir(image_directory)
+        for number in (10, 2, 1):
+            Image.new('RGB', (number, 10)).save(os.path.join(image_directory, f'page{number}.png'))
+        with open(os.path.join(image_directory, 'notes.txt'), 'w') as notes:
+            notes.write("not a page")
+
+        widths = [image.size[0] for _, image in documents.iter_pages(image_directory)]
+
+        self.assertEqual(widths, [1, 2, 10], "Should read 'page2' before 'page10' and skip other files.")
+
+    def test_process_document_in_order_with_bounded_pages(self):
+        """
+        Tests if pages are yielded in page order even when later pages finish first, and if no more
+        than max_pages_in_flight pages are processed at once.
+        """
+
+        in_flight = 0
+        most_in_flight = 0
+
+        async def process_image(image, target_language='en', source_language=None, executor=None):
+            nonlocal in_flight, most_in_flight
+            in_flight += 1
+            most_in_flight = max(most_in_flight, in_flight)
+
+            await asyncio.sleep(0.05 if image.size[0] == 100 else 0.01)    # The first page is the slowest
+            in_flight -= 1
+
+            return ProcessingResult(source_text=str(image.size[0]), translated_text=f"{image.size[0]} in {target_language}")
+
+        async def collect():
+            return [(page_number, result.translated_text) async for page_number, result
+                    in documents.process_document(self.tiff_path, target_language='de', max_pages_in_flight=2)]
+
+        with mock.patch.object(documents.processing, 'process_image', process_image):
+            pages = asyncio.run(collect())
+
+        self.assertEqual(pages, [(page, f"{99 + page} in de") for page in range(1, 6)])
+        self.assertLessEqual(most_in_flight, 2, "Should not process more pages at once than allowed.")
+        self.assertEqual(most_in_flight, 2, "Should overlap the processing of consecutive pages.")
+
+    def test_command_line_without_source_language(self):
+        """
+        Tests if the command line translates every page when no source language is given,
+        letting the translation service detect it.
+        """
+
+        words = ["alpha", "bravo", "charlie", "delta", "echo"]
+        requested = []
+
+        class FakeTranslator:
+            """
+            Stands in for googletrans.Translator and records the requested languages.
+            """
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            async def translate(self, text, src, dest):
+                requested.append(src)
+                return mock.Mock(text=f"{text} in {dest}")
+
+        def recognize_text(image, source_language=None):
+            return f"Document page {words[image.size[0] - 100]}"
+
+        output = io.StringIO()
+        with mock.patch.object(sys, 'argv', ['snaptranslate-document', self.tiff_path, '--target', 'de']), \
+             mock.patch.object(documents.processing, 'recognize_text', recognize_text), \
+             mock.patch.object(documents.translator, 'Translator', FakeTranslator), \
+             mock.patch.object(documents.translator, 'circuit_breaker', documents.translator.resilience.CircuitBreaker()), \
+             contextlib.redirect_stdout(output):
+            documents.main()
+
+        for page, word in enumerate(words, start=1):
+            self.assertIn(f"--- Page {page} ---\nDocument page {word} in de", output.getvalue())
+        self.assertEqual(set(requested), {'auto'}, "Should ask the translation service to detect the language.")
+
+    def test_pdf_without_renderer(self):
+        """
+        Tests if reading a PDF without pypdfium2 installed gives an explanatory ImportError.
+        """
+
+        try:
+            import pypdfium2
+            self.skipTest("pypdfium2 is installed.")
+        except ImportError:
+            pass
+
+        with self.assertRaisesRegex(ImportError, "pypdfium2"):
+            list(documents.iter_pages(os.path.join(self.directory.name, 'document.pdf')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_glossary.py
+
+"""
+This module contains unit tests for the offline glossary in the src.core.glossary module.
+It uses the unittest framework with TSV files written to a temporary directory.
+"""
+
+import unittest
+import os
+import tempfile
+
+from src.core import glossary
+
+GLOSSARY_TSV = """# Russian to English interface terms
+Сохранить\tSave
+Настройки\tPreferences
+Сохранить как\tSave As
+Рабочий стол\tDesktop
+malformed line without a tab
+"""
+
+class TestGlossary(unittest.TestCase):
+    """
+    Test suite for the glossary module.
+    """
+
+    def setUp(self):
+        """
+        Writes and loads a glossary in a temporary directory.
+        """
+
+        self.directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.directory.name, "ru-en.tsv"), "w", encoding="utf-8") as tsv_file:
+            tsv_file.write(GLOSSARY_TSV)
+
+        self.glossaries = glossary.load_glossaries(self.directory.name)
+        self.glossary = self.glossaries[('ru', 'en')]
+
+    def tearDown(self):
+        """
+        Closes the glossaries and removes the temporary directory.
+        """
+
+        for loaded in self.glossaries.values():
+            loaded.close()
+        self.directory.cleanup()
+
+    def test_exact_lookup(self):
+        """
+        Tests if terms are found regardless of case, spacing and trailing punctuation, and others are not.
+        """
+
+        self.assertEqual(len(self.glossary), 4, "Should skip comments and malformed lines.")
+        self.assertEqual(self.glossary.lookup("Настройки"), "Preferences")
+        self.assertEqual(self.glossary.lookup("  сохранить   КАК: "), "Save As")
+        self.assertIsNone(self.glossary.lookup("Открыть"))
+        self.assertIsNone(self.glossary.lookup(""))
+
+    def test_index_is_compiled_once(self):
+        """
+        Tests if the compiled index is reused while the TSV file is unchanged.
+        """
+
+        index_path = os.path.join(self.directory.name, "ru-en.tsv.idx")
+        self.assertTrue(os.path.exists(index_path))
+        modified = os.path.getmtime(index_path)
+
+        reloaded = glossary.load_glossaries(self.directory.name)
+        self.assertEqual(os.path.getmtime(index_path), modified, "Should not recompile an up-to-date index.")
+        reloaded[('ru', 'en')].close()
+
+    def test_find_terms_prefers_longest(self):
+        """
+        Tests if the longest glossary term at each position is found inside a longer text.
+        """
+
+        text = "Нажмите Сохранить как, чтобы сохранить на Рабочий стол."
+        spans = self.glossary.find_terms(text)
+
+        self.assertEqual([(text[start:end], translation) for start, end, translation in spans],
+                         [("Сохранить как", "Save As"), ("сохранить", "Save"), ("Рабочий стол", "Desktop")])
+
+    def test_protect_and_restore_terms(self):
+        """
+        Tests if terms are replaced by placeholders and the glossary translations are put back.
+        """
+
+        protected, translations = glossary.protect_terms("Откройте Настройки и нажмите Сохранить", self.glossary)
+
+        self.assertEqual(protected, "Откройте {0} и нажмите {1}")
+        self.assertEqual(glossary.restore_terms("Open {0} and click {1}", translations), "Open Preferences and click Save")
+        self.assertIsNone(glossary.restore_terms("Open {0} and click", translations), "Should detect a lost placeholder.")
+
+if __name__ == '__main__':
+    unittest.main()
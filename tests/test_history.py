@@ -0,0 +1,130 @@
+# tests/test_history.py
+
+"""
+This module contains unit tests for the capture history in the src.core.history module.
+It uses the unittest framework with a temporary database for every test.
+"""
+
+import unittest
+import io
+import os
+import tempfile
+
+from PIL import Image
+from src.core import history
+
+class TestHistory(unittest.TestCase):
+    """
+    Test suite for the HistoryStore.
+    """
+
+    def setUp(self):
+        """
+        Creates a HistoryStore in a temporary directory.
+        """
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = history.HistoryStore(history.HistoryConfig(path=os.path.join(self.directory.name, "history.db")))
+
+    def tearDown(self):
+        """
+        Stops the writer thread and removes the temporary directory.
+        """
+
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_search_source_and_translated_text(self):
+        """
+        Tests if stored captures are found by words of either text, including a prefix of the last word.
+        """
+
+        self.store.add(Image.new('RGB', (50, 20), color='white'), "Сохранить файл", "Save file", 'ru', 'en')
+        self.store.add(Image.new('RGB', (50, 20), color='gray'), "Inställningar", "Settings", 'sv', 'en')
+        self.store.flush()
+
+        self.assertEqual([entry.translated_text for entry in self.store.search("файл")], ["Save file"])
+        self.assertEqual([entry.source_text for entry in self.store.search("sett")], ["Inställningar"], "Should match a prefix of the last word.")
+        self.assertEqual(self.store.search("missing"), [])
+        self.assertEqual(len(self.store.search("")), 2, "An empty query should return the most recent captures.")
+
+    def test_search_escapes_query_syntax(self):
+        """
+        Tests if characters with a meaning in FTS5 queries are searched for literally instead of failing.
+        """
+
+        self.store.add(Image.new('RGB', (50, 20), color='white'), "Hello \"world\"", "Привет", 'en', 'ru')
+        self.store.flush()
+
+        self.assertEqual(len(self.store.search('"world" AND (')), 0)
+        self.assertEqual(len(self.store.search('world')), 1)
+
+    def test_find_by_image_and_thumbnail(self):
+        """
+        Tests if a repeated capture is recognized by its image hash and its thumbnail can be read back.
+        """
+
+        image = Image.new('RGB', (800, 400), color='white')
+        self.store.add(image, "Привет", "Hello", 'ru', 'en')
+        self.store.flush()
+
+        entry = self.store.find_by_image(history.hash_image(image), 'ru', 'en')
+        self.assertIsNotNone(entry, "Should find an identical capture.")
+        self.assertEqual(entry.translated_text, "Hello")
+        self.assertIsNone(self.store.find_by_image(history.hash_image(image), 'ru', 'de'), "Should not match other languages.")
+
+        thumbnail = Image.open(io.BytesIO(self.store.get_thumbnail(entry.id)))
+        self.assertEqual(thumbnail.size, (320, 160), "Should store a downscaled thumbnail.")
+
+    def test_one_thumbnail_per_capture(self):
+        """
+        Tests if a capture translated into several languages is hashed by the writer and thumbnailed only once.
+        """
+
+        image = Image.new('RGB', (800, 400), color='white')
+        for target_language, translated_text in [('en', "Hello"), ('de', "Hallo"), ('fr', "Bonjour")]:
+            self.store.add(image, "Привет", translated_text, 'ru', target_language)
+        self.store.flush()
+
+        entries = self.store.recent()
+        self.assertEqual(len(entries), 3)
+        self.assertEqual({entry.image_hash for entry in entries}, {history.hash_image(image)})
+        self.assertEqual(self.store._reader().execute("SELECT COUNT(*) FROM thumbnails").fetchone()[0], 1, "Should store a single thumbnail.")
+
+        for entry in entries:
+            self.assertIsNotNone(self.store.get_thumbnail(entry.id), "Every language should show the shared thumbnail.")
+
+    def test_hash_image_tells_captures_apart(self):
+        """
+        Tests if the downscaled hash still changes when a small detail of the capture changes.
+        """
+
+        image = Image.new('RGB', (200, 100), color='white')
+        changed = image.copy()
+        changed.putpixel((101, 51), (0, 0, 0))
+
+        self.assertEqual(history.hash_image(image), history.hash_image(image.copy()))
+        self.assertNotEqual(history.hash_image(image), history.hash_image(changed))
+        self.assertNotEqual(history.hash_image(image), history.hash_image(image.resize((100, 200))), "Should tell sizes apart.")
+
+    def test_size_limit_removes_oldest(self):
+        """
+        Tests if the oldest captures are removed when the history grows over its size limit.
+        """
+
+        path = self.store.config.path
+        self.store.max_bytes = os.path.getsize(path) + 40000   # Room for a few of the captures below, with their index
+        for index in range(20):
+            self.store.add(Image.new('RGB', (10, 10), color='white'), f"text{index} " + " ".join(f"word{index}x{number}" for number in range(500)),
+                           f"translation{index}", 'en', 'ru')
+        self.store.flush()
+
+        entries = self.store.recent(limit=100)
+        self.assertLess(len(entries), 20, "Should remove captures over the limit.")
+        self.assertEqual(entries[0].source_text.split()[0], "text19", "Should keep the most recent capture.")
+
+        wal_size = os.path.getsize(path + '-wal') if os.path.exists(path + '-wal') else 0
+        self.assertLessEqual(os.path.getsize(path) + wal_size, self.store.max_bytes, "Should bound the files on disk, index included.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@ import unittest
 import pytesseract
 import os
 
+from unittest import mock
 from src.core import ocr
 from PIL import Image, ImageDraw, ImageFont
 
@@ -81,5 +82,94 @@ class TestOCR(unittest.TestCase):
         with self.assertRaises(AttributeError): # Expecting an AttributeError if None is passed
             ocr.extract_text_from_image(None)
 
+    def test_split_into_text_blocks(self):
+        """
+        Tests if lines close together form one block and a wide gap starts a new one, in reading order.
+        """
+
+        image = Image.new('RGB', (100, 120), color='white')
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((10, 10, 90, 19), fill='black')   # First paragraph, line 1
+        draw.rectangle((10, 24, 90, 33), fill='black')   # First paragraph, line 2
+        draw.rectangle((10, 80, 90, 89), fill='black')   # Second paragraph
+
+        blocks = ocr.split_into_text_blocks(image, padding=0)
+        self.assertEqual(blocks, [(10, 34), (80, 90)], "Should group nearby lines and split at wide gaps.")
+
+    def test_split_into_text_blocks_ignores_vertical_rules(self):
+        """
+        Tests if a vertical line such as a window border or table rule does not merge all blocks into one.
+        """
+
+        image = Image.new('RGB', (100, 120), color='white')
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((10, 10, 80, 19), fill='black')   # First paragraph
+        draw.rectangle((10, 80, 80, 89), fill='black')   # Second paragraph
+        draw.line((95, 0, 95, 119), fill='black')        # Vertical divider over the whole height
+
+        blocks = ocr.split_into_text_blocks(image, padding=0)
+        self.assertEqual(blocks, [(10, 20), (80, 90)], "Should split at the gap despite the divider.")
+
+    def test_split_blank_image_into_text_blocks(self):
+        """
+        Tests if a blank image has no text blocks, whatever its background colour.
+        """
+
+        self.assertEqual(ocr.split_into_text_blocks(Image.new('RGB', (100, 30), color='white')), [])
+        self.assertEqual(ocr.split_into_text_blocks(Image.new('RGB', (100, 30), color='black')), [])
+
+    def test_parse_ocr_data(self):
+        """
+        Tests if image_to_data output is grouped into blocks, lines and words with boxes mapped back to the original image.
+        """
+
+        # Entries as returned by pytesseract.image_to_data: a block entry (conf -1) followed by words
+        data = {
+            'block_num': [1, 1, 1, 1, 2],
+            'par_num':   [0, 1, 1, 1, 1],
+            'line_num':  [0, 1, 1, 2, 1],
+            'left':      [0, 20, 80, 20, 40],
+            'top':       [0, 20, 20, 60, 200],
+            'width':     [400, 50, 60, 70, 40],
+            'height':    [300, 20, 20, 20, 20],
+            'conf':      ['-1', '95', '90', '40', '88'],
+            'text':      ['', 'Hello', 'world', 'again', 'Bye'],
+        }
+
+        result = ocr.parse_ocr_data(data, scale=2.0, offset=(100, 10))
+
+        self.assertEqual(result.text, "Hello world\nagain\n\nBye", "Should keep the block and line structure.")
+        self.assertEqual(len(result.lines), 3)
+        self.assertEqual(result.lines[0].box, (110, 20, 170, 30), "Should scale boxes back and add the offset.")
+        self.assertAlmostEqual(result.lines[0].confidence, 92.5)
+        self.assertEqual(result.lines[1].confidence, 40.0)
+
+    def test_extract_text_with_reocr_reruns_only_unclear_lines(self):
+        """
+        Tests if only the lines below the confidence threshold are OCRed again, with the accurate
+        profile, and replaced when the second pass is more confident.
+        """
+
+        first_pass = ocr.OcrResult(blocks=[ocr.OcrBlock(lines=[
+            ocr.OcrLine(words=[ocr.OcrWord("Clear", 10, 10, 50, 20, 95), ocr.OcrWord("line", 70, 10, 40, 20, 90)]),
+            ocr.OcrLine(words=[ocr.OcrWord("Bl0rry", 10, 50, 60, 20, 30), ocr.OcrWord("1ine", 80, 50, 40, 20, 40)]),
+        ])])
+        second_pass = ocr.OcrResult(blocks=[ocr.OcrBlock(lines=[
+            ocr.OcrLine(words=[ocr.OcrWord("Blurry", 10, 50, 60, 20, 85), ocr.OcrWord("line", 80, 50, 40, 20, 88)]),
+        ])])
+        calls = []
+
+        def extract_structured_text(image, language=None, profile=ocr.FAST_PROFILE, offset=(0, 0)):
+            calls.append((profile, image.size, offset))
+            return first_pass if profile is ocr.FAST_PROFILE else second_pass
+
+        with mock.patch.object(ocr, 'extract_structured_text', extract_structured_text):
+            result = ocr.extract_text_with_reocr(Image.new('RGB', (200, 100), color='white'), confidence_threshold=60, padding=4)
+
+        self.assertEqual(len(calls), 2, "Should OCR the image once and only the unclear line again.")
+        self.assertIs(calls[1][0], ocr.ACCURATE_PROFILE)
+        self.assertEqual(calls[1][1:], ((118, 28), (6, 46)), "Should re-OCR the padded box of the unclear line.")
+        self.assertEqual(result.text, "Clear line\nBlurry line", "Should replace only the unclear line.")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
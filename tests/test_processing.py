@@ -7,8 +7,12 @@ This module contains unit tests for the image processing and translation functio
 import unittest
 import asyncio
 
+from unittest import mock
 from PIL import Image, ImageDraw, ImageFont
+from src.core import ocr
 from src.core import processing
+from src.core import translation_memory
+from src.core import translator
 
 class TestImageProcessing(unittest.TestCase):
     """
@@ -103,5 +107,206 @@ class TestImageProcessing(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_translate_to_several_languages(self):
+        """
+        Tests if one text is translated into every requested language, each reported once.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            # Use cached translations so that the test does not depend on the network
+            translator.cache.put("Привет", 'ru', 'en', "Hello")
+            translator.cache.put("Привет", 'ru', 'de', "Hallo")
+
+            results = {}
+            async for target_language, translated_text in processing.translate_to_languages("Привет", ['en', 'de', 'en'], source_language='ru'):
+                self.assertNotIn(target_language, results, "Should report each language once.")
+                results[target_language] = translated_text
+
+            self.assertEqual(results, {'en': "Hello", 'de': "Hallo"}, "Should translate into every requested language.")
+
+        asyncio.run(run_test())
+
+    def test_process_image_with_no_text_into_several_languages(self):
+        """
+        Tests if an image with no text results in the "No text found" message for every language.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            image = Image.new('RGB', (100, 30), color='white')
+            results = [item async for item in processing.process_image_and_translate_many(image, ['en', 'de'])]
+
+            self.assertEqual([target_language for target_language, _ in results], ['en', 'de'])
+            for _, result in results:
+                self.assertEqual(result.translated_text, "No text found in the image.")
+
+        asyncio.run(run_test())
+
+    def test_stream_image_with_no_text(self):
+        """
+        Tests if streaming an image with no text yields only the "No text found" message.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            image = Image.new('RGB', (100, 30), color='white')
+            results = [result async for result in processing.stream_image_and_translate(image)]
+
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0].translated_text, "No text found in the image.")
+
+        asyncio.run(run_test())
+
+    def test_stream_single_block_uses_whole_image(self):
+        """
+        Tests if a capture with only one text block is OCRed whole.
+        """
+
+        ocr_calls = []
+
+        def extract_text_from_image(image, language=None, reencode=True):
+            ocr_calls.append(image.size)
+            return ""
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            image = Image.new('RGB', (100, 60), color='white')
+            ImageDraw.Draw(image).rectangle((10, 20, 90, 29), fill='black')
+
+            with mock.patch.object(processing.ocr, 'extract_text_from_image', extract_text_from_image):
+                return [result async for result in processing.stream_image_and_translate(image)]
+
+        results = asyncio.run(run_test())
+
+        self.assertEqual(ocr_calls, [(100, 60)], "Should OCR the whole image once.")
+        self.assertEqual(results[0].translated_text, "No text found in the image.")
+
+    def test_stream_ocrs_faint_text_without_blocks(self):
+        """
+        Tests if a capture where no block is found (text fainter than the ink threshold) is still OCRed whole.
+        """
+
+        ocr_calls = []
+
+        def extract_text_from_image(image, language=None, reencode=True):
+            ocr_calls.append(image.size)
+            return "Faint"
+
+        async def translate_text_detailed(text, src_lang='ru', dest_lang='en'):
+            return translator.TranslationResult(text=f"{text} ({dest_lang})", served_by='primary')
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            image = Image.new('RGB', (100, 60), color=(60, 60, 60))
+            ImageDraw.Draw(image).rectangle((10, 20, 90, 29), fill=(100, 100, 100))
+            self.assertEqual(ocr.split_into_text_blocks(image), [], "The text should be below the ink threshold.")
+
+            with mock.patch.object(processing.ocr, 'extract_text_from_image', extract_text_from_image), \
+                 mock.patch.object(processing.translator, 'translate_text_detailed', translate_text_detailed):
+                return [result async for result in processing.stream_image_and_translate(image, target_language='de')]
+
+        results = asyncio.run(run_test())
+
+        self.assertEqual(ocr_calls, [(100, 60)], "Should OCR the whole image.")
+        self.assertEqual([result.translated_text for result in results], ["Faint (de)"])
+
+    def test_stream_applies_reocr(self):
+        """
+        Tests if streamed blocks are recognized with the re-OCR strategy when it is enabled.
+        """
+
+        def extract_text_with_reocr(image, language=None, confidence_threshold=60.0):
+            return ocr.OcrResult(blocks=[ocr.OcrBlock(lines=[ocr.OcrLine(words=[ocr.OcrWord("Re-read", 0, 0, 10, 10, 90)])])])
+
+        async def translate_text_detailed(text, src_lang='ru', dest_lang='en'):
+            return translator.TranslationResult(text=f"{text} ({dest_lang})", served_by='primary')
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            image = Image.new('RGB', (100, 60), color='white')
+            ImageDraw.Draw(image).rectangle((10, 20, 90, 29), fill='black')
+
+            with mock.patch.object(processing.ocr, 'reocr_threshold', 60), \
+                 mock.patch.object(processing.ocr, 'extract_text_with_reocr', extract_text_with_reocr), \
+                 mock.patch.object(processing.translator, 'translate_text_detailed', translate_text_detailed):
+                return [result async for result in processing.stream_image_and_translate(image, target_language='de')]
+
+        results = asyncio.run(run_test())
+
+        self.assertEqual([result.translated_text for result in results], ["Re-read (de)"])
+
+    def test_process_image_reports_memory_match(self):
+        """
+        Tests if a match found in the translation memory is passed on with the result.
+        """
+
+        memory_match = translation_memory.MemoryMatch("You have 3 new messages", "Sie haben 3 neue Nachrichten", 0.85)
+
+        async def translate_text_detailed(text, src_lang='ru', dest_lang='en'):
+            return translator.TranslationResult(text="Sie haben 5 neue Nachrichten", served_by='primary', memory_match=memory_match)
+
+        with mock.patch.object(processing, 'recognize_text', lambda image, source_language=None: "You have 5 new messages"), \
+             mock.patch.object(processing.translator, 'translate_text_detailed', translate_text_detailed):
+            result = asyncio.run(processing.process_image(Image.new('RGB', (100, 30), color='white'), target_language='de'))
+
+        self.assertEqual(result.translated_text, "Sie haben 5 neue Nachrichten")
+        self.assertIs(result.memory_match, memory_match, "Should report the flagged match.")
+
+    def test_normalize_reflows_and_dehyphenates(self):
+        """
+        Tests if wrapped and hyphenated lines are joined into one line, and the mapping points back to them.
+        """
+
+        normalized = processing.normalize_ocr_text("This is a long sen-\ntence that wraps\naround  the screen.")
+
+        self.assertEqual(normalized.text, "This is a long sentence that wraps around the screen.")
+        self.assertEqual(normalized.line_map, [[0, 1, 2]], "Should map the paragraph back to its original lines.")
+
+    def test_normalize_keeps_labels_and_strips_noise(self):
+        """
+        Tests if separate labels stay on their own lines while noise glyphs and noise-only lines are removed.
+        """
+
+        normalized = processing.normalize_ocr_text("| Сохранить\n—— |\nОтмена •\n\n   \nНастройки")
+
+        self.assertEqual(normalized.text, "Сохранить\nОтмена\nНастройки")
+        self.assertEqual(normalized.line_map, [[0], [2], [5]])
+        self.assertEqual(normalized.original_lines[1], "—— |", "Should keep the original lines for the mapping.")
+
+    def test_normalize_noise_only(self):
+        """
+        Tests if OCR output without letters or digits normalizes to an empty text.
+        """
+
+        self.assertEqual(processing.normalize_ocr_text(" | ~ \n ___ \n").text, "")
+
+    def test_normalize_keeps_glyphs_inside_words(self):
+        """
+        Tests if noise glyphs are kept inside words and only stripped where they stand alone or stick to the line edges.
+        """
+
+        normalized = processing.normalize_ocr_text("Col·lecció ~5 min a|b\n|Desa ^ arxiu•\n• ~/.config")
+
+        self.assertEqual(normalized.text, "Col·lecció ~5 min a|b\nDesa arxiu\n~/.config")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,209 @@
+# tests/test_resilience.py
+
+"""
+This module contains unit tests for the tail-latency controls in the src.core.resilience module.
+It uses the unittest framework to verify retries, deadlines, hedging and the circuit breaker.
+"""
+
+import unittest
+import asyncio
+import random
+
+from src.core import resilience
+
+class FakeClock:
+    """
+    A manually advanced clock for the circuit breaker tests.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestResilience(unittest.TestCase):
+    """
+    Test suite for the resilience module.
+    """
+
+    def test_retries_transient_errors(self):
+        """
+        Tests if a transient error is retried and the retry path is reported.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            calls = []
+
+            async def operation():
+                calls.append(1)
+                if len(calls) == 1:
+                    raise ConnectionError("connection reset")
+                return "ok"
+
+            policy = resilience.ResiliencePolicy(max_retries=2, backoff_base=0.001, backoff_max=0.001)
+            outcome = await resilience.call_with_policy(operation, policy, rng=random.Random(0))
+
+            self.assertEqual(outcome.result, "ok")
+            self.assertEqual(outcome.path, "retry-1:primary", "Should report that a retry served the request.")
+            self.assertEqual(outcome.attempts, 2)
+
+        asyncio.run(run_test())
+
+    def test_does_not_retry_other_errors(self):
+        """
+        Tests if an error that is not transient is raised without retrying or tripping the breaker.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            calls = []
+
+            async def operation():
+                calls.append(1)
+                raise ValueError("bad response")
+
+            breaker = resilience.CircuitBreaker(failure_threshold=1)
+            with self.assertRaises(ValueError):
+                await resilience.call_with_policy(operation, resilience.ResiliencePolicy(max_retries=3), breaker=breaker)
+
+            self.assertEqual(len(calls), 1, "Should not retry a non-transient error.")
+            self.assertEqual(breaker.state, resilience.CircuitBreaker.CLOSED, "Should not count a non-transient error as a backend failure.")
+
+        asyncio.run(run_test())
+
+    def test_attempt_timeout(self):
+        """
+        Tests if a hanging request is abandoned once the deadline is exceeded.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            async def operation():
+                await asyncio.sleep(10)
+
+            policy = resilience.ResiliencePolicy(deadline=0.2, attempt_timeout=0.05, max_retries=1,
+                                                 backoff_base=0.001, backoff_max=0.001)
+
+            with self.assertRaises(asyncio.TimeoutError):
+                await resilience.call_with_policy(operation, policy)
+
+        asyncio.run(run_test())
+
+    def test_hedged_request_wins(self):
+        """
+        Tests if a hedge is fired for a slow request and its result is used.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            delays = [1.0, 0.0]     # The primary is slow, the hedge is fast
+
+            async def operation():
+                await asyncio.sleep(delays.pop(0))
+                return "done"
+
+            tracker = resilience.LatencyTracker(min_samples=1)
+            tracker.record(0.01)
+            policy = resilience.ResiliencePolicy(attempt_timeout=2.0, hedge_enabled=True, hedge_min_delay=0.02)
+            outcome = await resilience.call_with_policy(operation, policy, tracker=tracker)
+
+            self.assertEqual(outcome.result, "done")
+            self.assertEqual(outcome.path, "hedge", "Should report that the hedge served the request.")
+            self.assertLess(outcome.elapsed, 0.5, "Should not wait for the slow primary.")
+
+        asyncio.run(run_test())
+
+    def test_circuit_breaker_opens_and_recovers(self):
+        """
+        Tests if the breaker opens after repeated failures, fails fast, and closes after a successful probe.
+        """
+
+        clock = FakeClock()
+        breaker = resilience.CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, resilience.CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request(), "Should fail fast while open.")
+
+        clock.now = 10
+        self.assertTrue(breaker.allow_request(), "Should let one probe through after the reset timeout.")
+        self.assertFalse(breaker.allow_request(), "Should let only one probe through.")
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, resilience.CircuitBreaker.CLOSED)
+
+    def test_open_circuit_rejects_calls(self):
+        """
+        Tests if call_with_policy raises CircuitOpenError without calling the operation while the circuit is open.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            calls = []
+
+            async def operation():
+                calls.append(1)
+                return "ok"
+
+            breaker = resilience.CircuitBreaker(failure_threshold=1, reset_timeout=60)
+            breaker.record_failure()
+
+            with self.assertRaises(resilience.CircuitOpenError):
+                await resilience.call_with_policy(operation, resilience.ResiliencePolicy(), breaker=breaker)
+
+            self.assertEqual(calls, [], "Should not call the backend while the circuit is open.")
+
+        asyncio.run(run_test())
+
+    def test_cancelled_probe_is_released(self):
+        """
+        Tests if a half-open probe that is cancelled lets the next request probe instead of
+        leaving the circuit rejecting every request.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            clock = FakeClock()
+            breaker = resilience.CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+            breaker.record_failure()
+            clock.now = 10
+
+            async def slow_operation():
+                await asyncio.sleep(10)
+
+            probe = asyncio.create_task(resilience.call_with_policy(slow_operation, resilience.ResiliencePolicy(), breaker=breaker))
+            await asyncio.sleep(0.01)
+            self.assertFalse(breaker.allow_request(), "Should let only one probe through.")
+
+            probe.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await probe
+
+            self.assertTrue(breaker.allow_request(), "Should let a new probe through after the first was cancelled.")
+
+        asyncio.run(run_test())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,308 @@
+# tests/test_server.py
+
+"""
+This module contains unit tests for the HTTP server in the src.core.server module.
+The OCR and translation pipeline is replaced by a local coroutine so that the tests do not
+depend on Tesseract or the network.
+"""
+
+import unittest
+import asyncio
+import io
+import json
+
+from unittest import mock
+from PIL import Image
+from src.core import server
+from src.core.processing import ProcessingResult
+from src.core.translation_memory import MemoryMatch
+
+def make_png() -> bytes:
+    """
+    Returns a small white PNG image as bytes.
+    """
+
+    image_bytes = io.BytesIO()
+    Image.new('RGB', (40, 20), color='white').save(image_bytes, format='PNG')
+
+    return image_bytes.getvalue()
+
+async def send_request(port: int, method: str, target: str, body: bytes = b"", chunked: bool = False):
+    """
+    Sends one HTTP request to the local server.
+
+    Returns:
+        A tuple (status, headers, json_payload).
+    """
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+    head = f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+    if chunked:
+        head += "Transfer-Encoding: chunked\r\n\r\n"
+        payload = b"".join(f"{len(body[i:i + 100]):x}\r\n".encode() + body[i:i + 100] + b"\r\n" for i in range(0, len(body), 100))
+        payload += b"0\r\n\r\n"
+    else:
+        head += f"Content-Length: {len(body)}\r\n\r\n"
+        payload = body
+
+    writer.write(head.encode('latin-1') + payload)
+    await writer.drain()
+
+    response = await reader.read()
+    writer.close()
+
+    response_head, response_body = response.split(b"\r\n\r\n", 1)
+    lines = response_head.decode('latin-1').split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+
+    return int(lines[0].split(" ")[1]), headers, json.loads(response_body)
+
+class TestServer(unittest.TestCase):
+    """
+    Test suite for the TranslationServer.
+    """
+
+    def run_with_server(self, test, pipeline, **config):
+        """
+        Starts a server on a free port with the given pipeline, runs the test coroutine against it and stops it.
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            settings = dict(host='127.0.0.1', port=0, ocr_workers=1)
+            settings.update(config)
+            translation_server = server.TranslationServer(server.ServerConfig(**settings), pipeline=pipeline)
+            await translation_server.start()
+
+            try:
+                await test(translation_server)
+            finally:
+                await translation_server.close()
+
+        asyncio.run(run_test())
+
+    def test_translate_returns_text_and_translation(self):
+        """
+        Tests if an uploaded image is run through the pipeline and both texts are returned as JSON.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text=f"{image.size[0]}x{image.size[1]}", translated_text=f"to {target_language}")
+
+        async def test(translation_server):
+            status, _, payload = await send_request(translation_server.port, "POST", "/translate?target=de&source=ru", make_png())
+
+            self.assertEqual(status, 200)
+            self.assertEqual(payload["text"], "40x20", "Should run the pipeline on the uploaded image.")
+            self.assertEqual(payload["translation"], "to de", "Should pass the target language to the pipeline.")
+            self.assertEqual(payload["source_language"], "ru")
+            self.assertIsNone(payload["memory_match"])
+
+        self.run_with_server(test, pipeline)
+
+    def test_translate_reports_memory_match(self):
+        """
+        Tests if a similar earlier text found in the translation memory is reported in the JSON response.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text="You have 5 new messages", translated_text="Sie haben 5 neue Nachrichten",
+                                    memory_match=MemoryMatch("You have 3 new messages", "Sie haben 3 neue Nachrichten", 0.81234))
+
+        async def test(translation_server):
+            status, _, payload = await send_request(translation_server.port, "POST", "/translate?target=de", make_png())
+
+            self.assertEqual(status, 200)
+            self.assertEqual(payload["memory_match"], {"text": "You have 3 new messages", "translation": "Sie haben 3 neue Nachrichten",
+                                                       "similarity": 0.812})
+
+        self.run_with_server(test, pipeline)
+
+    def test_chunked_upload(self):
+        """
+        Tests if an image sent with chunked transfer encoding is accepted.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            status, _, payload = await send_request(translation_server.port, "POST", "/translate", make_png(), chunked=True)
+
+            self.assertEqual(status, 200)
+            self.assertEqual(payload["translation"], "translation")
+
+        self.run_with_server(test, pipeline)
+
+    def test_rejects_when_saturated(self):
+        """
+        Tests if requests are rejected with 429 once the worker and the queue are full.
+        """
+
+        release = asyncio.Event()
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            await release.wait()
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            port = translation_server.port
+            busy = []
+
+            # Wait until one job is being processed, then until a second one is waiting in the queue
+            busy.append(asyncio.create_task(send_request(port, "POST", "/translate", make_png())))
+            while translation_server.counters['in_flight'] < 1:
+                await asyncio.sleep(0.01)
+
+            busy.append(asyncio.create_task(send_request(port, "POST", "/translate", make_png())))
+            while translation_server.queue.qsize() < 1:
+                await asyncio.sleep(0.01)
+
+            status, headers, _ = await send_request(port, "POST", "/translate", make_png())
+            self.assertEqual(status, 429, "Should reject requests when saturated.")
+            self.assertIn("Retry-After", headers)
+
+            release.set()
+            results = await asyncio.gather(*busy)
+            self.assertEqual([result[0] for result in results], [200, 200], "Should serve the queued requests.")
+
+            _, _, metrics = await send_request(port, "GET", "/metrics")
+            self.assertEqual(metrics["rejected_total"], 1)
+
+        self.run_with_server(test, pipeline, workers=1, queue_size=1)
+
+    def test_invalid_image(self):
+        """
+        Tests if a body that is not an image is answered with 400.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            status, _, payload = await send_request(translation_server.port, "POST", "/translate", b"not an image")
+
+            self.assertEqual(status, 400)
+            self.assertIn("error", payload)
+
+        self.run_with_server(test, pipeline)
+
+    def test_unknown_language(self):
+        """
+        Tests if an unknown target or source language is answered with 400 without running the pipeline.
+        """
+
+        calls = []
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            calls.append(target_language)
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            status, _, payload = await send_request(translation_server.port, "POST", "/translate?target=xx", make_png())
+            self.assertEqual(status, 400)
+            self.assertIn("target", payload["error"])
+
+            status, _, _ = await send_request(translation_server.port, "POST", "/translate?target=en&source=nope", make_png())
+            self.assertEqual(status, 400)
+
+            status, _, _ = await send_request(translation_server.port, "POST", "/translate?target=en&source=auto", make_png())
+            self.assertEqual(status, 200, "Should accept 'auto' as the source language.")
+            self.assertEqual(calls, ['en'], "Should not run the pipeline for unknown languages.")
+
+        self.run_with_server(test, pipeline)
+
+    def test_oversized_upload(self):
+        """
+        Tests if an upload larger than the configured limit is answered with 413.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            status, _, _ = await send_request(translation_server.port, "POST", "/translate", make_png())
+
+            self.assertEqual(status, 413)
+
+        self.run_with_server(test, pipeline, max_body_size=10)
+
+    def test_decompression_bomb(self):
+        """
+        Tests if an image with more pixels than Pillow accepts is answered with 413 instead of 500.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            with mock.patch.object(server.Image, 'MAX_IMAGE_PIXELS', 100):    # The 40x20 test image is then a bomb
+                status, _, payload = await send_request(translation_server.port, "POST", "/translate", make_png())
+
+            self.assertEqual(status, 413)
+            self.assertIn("pixels", payload["error"])
+
+        self.run_with_server(test, pipeline)
+
+    def test_overlong_chunk_size_line(self):
+        """
+        Tests if a chunk size line longer than the stream limit is answered with 400 instead of 500.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            reader, writer = await asyncio.open_connection('127.0.0.1', translation_server.port)
+            writer.write(b"POST /translate HTTP/1.1\r\nHost: localhost\r\nTransfer-Encoding: chunked\r\n\r\n"
+                         + b"0" * (server.MAX_HEADER_SIZE + 1000) + b"1\r\nx\r\n0\r\n\r\n")
+            await writer.drain()
+
+            response = await asyncio.wait_for(reader.read(), 2)
+            writer.close()
+
+            self.assertTrue(response.startswith(b"HTTP/1.1 400"), "Should reject the chunk size line as malformed.")
+
+        self.run_with_server(test, pipeline)
+
+    def test_stalled_body_times_out(self):
+        """
+        Tests if a client that announces a body and stops sending it is answered with 408.
+        """
+
+        async def pipeline(image, target_language='en', source_language=None, executor=None):
+            return ProcessingResult(source_text="text", translated_text="translation")
+
+        async def test(translation_server):
+            reader, writer = await asyncio.open_connection('127.0.0.1', translation_server.port)
+            writer.write(b"POST /translate HTTP/1.1\r\nHost: localhost\r\nContent-Length: 100\r\n\r\npartial")
+            await writer.drain()
+
+            response = await asyncio.wait_for(reader.read(), 2)
+            writer.close()
+
+            self.assertTrue(response.startswith(b"HTTP/1.1 408"), "Should time out a stalled upload.")
+
+        self.run_with_server(test, pipeline, read_timeout=0.2)
+
+    def test_health_and_unknown_endpoint(self):
+        """
+        Tests the health endpoint and the answer for an unknown path.
+        """
+
+        async def test(translation_server):
+            status, _, payload = await send_request(translation_server.port, "GET", "/health")
+            self.assertEqual(status, 200)
+            self.assertEqual(payload["status"], "ok")
+
+            status, _, _ = await send_request(translation_server.port, "GET", "/nothing-here")
+            self.assertEqual(status, 404)
+
+        self.run_with_server(test, None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# tests/test_shared_images.py
+
+"""
+This module contains unit tests for the shared memory image handoff in the src.core.shared_images module.
+"""
+
+import unittest
+import asyncio
+
+from multiprocessing import shared_memory
+from unittest import mock
+from PIL import Image, ImageDraw
+from src.core import processing
+from src.core import shared_images
+from src.core import translator
+
+RED = Image.new('RGB', (1, 1), color='red').convert('L').getpixel((0, 0))      # Grey levels of the stripes
+BLUE = Image.new('RGB', (1, 1), color='blue').convert('L').getpixel((0, 0))
+
+def describe_image(image, label=""):
+    """
+    Runs in a worker process: returns what the worker sees of the image.
+    """
+
+    return label, image.mode, image.size, image.getpixel((0, 0)), image.getpixel((0, image.size[1] - 1))
+
+def make_striped_image():
+    """
+    Returns an RGB image with a red top half and a blue bottom half, taller than one write strip.
+    """
+
+    image = Image.new('RGB', (30, 200), color='red')
+    image.paste((0, 0, 255), (0, 100, 30, 200))
+
+    return image
+
+class TestSharedImages(unittest.TestCase):
+    """
+    Test suite for the shared image pool and the shared memory OCR pool.
+    """
+
+    def test_pool_reuses_blocks(self):
+        """
+        Tests if a released block is reused for a request of the same size class, and if blocks are
+        removed from the system when the pool is closed.
+        """
+
+        pool = shared_images.SharedImagePool(max_idle_blocks=1)
+
+        block = pool.acquire(1000)
+        self.assertEqual(block.size, shared_images.MIN_BLOCK_SIZE)
+        name = block.name
+        pool.release(block)
+
+        block = pool.acquire(5000)
+        self.assertEqual(block.name, name, "Should reuse the idle block.")
+
+        larger = pool.acquire(3 * shared_images.MIN_BLOCK_SIZE)
+        self.assertEqual(larger.size, 4 * shared_images.MIN_BLOCK_SIZE, "Should round up to a power of two.")
+
+        pool.release(block)
+        pool.release(larger)    # Beyond max_idle_blocks: destroyed right away
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=larger.name)
+
+        pool.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_shared_image_round_trip(self):
+        """
+        Tests if a shared image and a band of its rows read back with the original pixels.
+        """
+
+        pool = shared_images.SharedImagePool()
+        image = make_striped_image()
+
+        with shared_images.SharedImage(pool, image) as shared:
+            descriptor = shared.descriptor
+            self.assertEqual((descriptor.mode, descriptor.stride), ('L', 30), "Should share one byte per pixel.")
+
+            mapped = shared_images.open_shared_image(descriptor, shared._block.buf)
+            self.assertEqual(mapped.tobytes(), image.convert('L').tobytes())
+            del mapped
+
+            band = shared_images.open_shared_image(descriptor.rows(150, 160), shared._block.buf)
+            self.assertEqual(band.size, (30, 10))
+            self.assertEqual(band.getpixel((0, 0)), BLUE)
+            del band
+
+        pool.close()
+
+    def test_run_in_worker_process(self):
+        """
+        Tests if worker processes see the image and a band of it through shared memory, and if the
+        block goes back to the pool once the jobs are done.
+        """
+
+        image = make_striped_image()
+
+        async def run_jobs(ocr_pool):
+            whole = await ocr_pool.run(describe_image, image, label="whole")
+
+            with ocr_pool.share(image) as shared:
+                bottom = await ocr_pool.run(describe_image, shared, region=(100, 200), label="bottom")
+
+            return whole, bottom
+
+        with shared_images.SharedMemoryOcrPool(max_workers=1) as ocr_pool:
+            whole, bottom = asyncio.run(run_jobs(ocr_pool))
+            self.assertEqual(ocr_pool.images._idle_count, 1, "Should reuse one block for both captures.")
+
+        self.assertEqual(whole, ("whole", 'L', (30, 200), RED, BLUE))
+        self.assertEqual(bottom, ("bottom", 'L', (30, 100), BLUE, BLUE))
+
+    def test_workers_are_spawned(self):
+        """
+        Tests if the worker processes are spawned rather than forked from the (multi-threaded) application.
+        """
+
+        with shared_images.SharedMemoryOcrPool(max_workers=1) as ocr_pool:
+            self.assertEqual(ocr_pool.executor._mp_context.get_start_method(), 'spawn')
+
+    def test_stream_returns_block_to_pool(self):
+        """
+        Tests if streaming through worker processes returns the shared block to the pool, and
+        takes none when the image cannot be split into blocks.
+        """
+
+        image = Image.new('RGB', (100, 120), color='white')
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((10, 10, 90, 19), fill='black')
+        draw.rectangle((10, 80, 90, 89), fill='black')
+
+        async def stream(ocr_pool):
+            return [result async for result in processing.stream_image_and_translate(image, executor=ocr_pool)]
+
+        async def translate_text_detailed(text, src_lang='ru', dest_lang='en'):
+            return translator.TranslationResult(text=text, served_by='primary')
+
+        def fail_to_split(image):
+            raise ValueError("cannot split")
+
+        with shared_images.SharedMemoryOcrPool(max_workers=1) as ocr_pool:
+            with mock.patch.object(processing.ocr, 'split_into_text_blocks', fail_to_split):
+                with self.assertRaises(ValueError):
+                    asyncio.run(stream(ocr_pool))
+            self.assertEqual(ocr_pool.images._idle_count, 0, "Should not take a block when splitting fails.")
+
+            with mock.patch.object(processing.translator, 'translate_text_detailed', translate_text_detailed):
+                results = asyncio.run(stream(ocr_pool))
+            self.assertTrue(results, "Should yield the blocks, or the no-text message.")
+            self.assertEqual(ocr_pool.images._idle_count, 1, "Should return the block once every band is OCRed.")
+
+if __name__ == '__main__':
+    unittest.main()
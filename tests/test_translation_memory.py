@@ -0,0 +1,129 @@
+# tests/test_translation_memory.py
+
+"""
+This module contains unit tests for the fuzzy translation memory in the src.core.translation_memory module.
+It uses the unittest framework to verify approximate lookups and the size bound.
+"""
+
+import unittest
+
+from src.core import translation_memory
+
+class TestTranslationMemory(unittest.TestCase):
+    """
+    Test suite for the TranslationMemory.
+    """
+
+    def test_finds_near_duplicate(self):
+        """
+        Tests if a segment differing by an OCR error and punctuation finds the earlier translation.
+        """
+
+        memory = translation_memory.TranslationMemory()
+        memory.add("Сохранить изменения перед выходом?", 'ru', 'en', "Save changes before exiting?")
+
+        match = memory.lookup("Сохранить изменения перед выхoдом", 'ru', 'en')   # Latin 'o' and no question mark
+
+        self.assertIsNotNone(match, "Should find the near-duplicate segment.")
+        self.assertEqual(match.translated_text, "Save changes before exiting?")
+        self.assertGreaterEqual(match.similarity, 0.8)
+        self.assertLess(match.similarity, 1.0)
+
+    def test_normalized_exact_match(self):
+        """
+        Tests if case and whitespace differences count as an exact match.
+        """
+
+        memory = translation_memory.TranslationMemory()
+        memory.add("Открыть  файл", 'ru', 'en', "Open file")
+
+        match = memory.lookup("открыть файл\n", 'ru', 'en')
+        self.assertEqual(match.similarity, 1.0)
+
+    def test_no_match_for_different_text_or_languages(self):
+        """
+        Tests if unrelated text, or the same text for another language pair, does not match.
+        """
+
+        memory = translation_memory.TranslationMemory()
+        memory.add("Сохранить изменения перед выходом?", 'ru', 'en', "Save changes before exiting?")
+
+        self.assertIsNone(memory.lookup("Удалить все файлы без подтверждения", 'ru', 'en'))
+        self.assertIsNone(memory.lookup("Сохранить изменения перед выходом?", 'ru', 'de'), "Should not match another language pair.")
+
+    def test_no_match_when_meaning_differs(self):
+        """
+        Tests if similar segments that say something else (a missing negation, another number) are not reused.
+        """
+
+        memory = translation_memory.TranslationMemory()
+        memory.add("Do not delete the selected files from the disk", 'en', 'de', "Die ausgewählten Dateien nicht von der Festplatte löschen")
+        memory.add("You have 3 new messages in your inbox", 'en', 'de', "Sie haben 3 neue Nachrichten in Ihrem Posteingang")
+        memory.add("Total amount: 1,250.00 EUR", 'en', 'de', "Gesamtbetrag: 1.250,00 EUR")
+
+        self.assertIsNone(memory.lookup("Do delete the selected files from the disk", 'en', 'de'), "Should not drop a negation.")
+        self.assertIsNone(memory.lookup("You have 5 new messages in your inbox", 'en', 'de'), "Should not change a number.")
+        self.assertIsNone(memory.lookup("Total amount: 7,250.00 EUR", 'en', 'de'), "Should not change an amount.")
+
+    def test_ocr_confusions_still_match(self):
+        """
+        Tests if digits read in place of letters still find the earlier translation.
+        """
+
+        memory = translation_memory.TranslationMemory()
+        memory.add("Connection to the server was lost", 'en', 'de', "Die Verbindung zum Server wurde getrennt")
+
+        match = memory.lookup("Connecti0n to the server was 1ost.", 'en', 'de')
+
+        self.assertIsNotNone(match, "Should treat '0' for 'o' and '1' for 'l' as OCR errors.")
+        self.assertEqual(match.translated_text, "Die Verbindung zum Server wurde getrennt")
+
+    def test_misread_characters_still_match(self):
+        """
+        Tests if a dropped or substituted character inside a word still finds the earlier translation.
+        """
+
+        memory = translation_memory.TranslationMemory()
+        memory.add("Please save your changes before closing the window", 'en', 'de', "Bitte speichern Sie Ihre Änderungen")
+
+        for misread in ["Please save your changes before closing the windw", "Please sve your changes before closing the window",
+                        "Please save your chanqes before closing the window", "Please save yourchanges before closing the window"]:
+            match = memory.lookup(misread, 'en', 'de')
+            self.assertIsNotNone(match, f"Should match '{misread}'.")
+            self.assertEqual(match.translated_text, "Bitte speichern Sie Ihre Änderungen")
+
+        self.assertIsNone(memory.lookup("Please save your changes before closing the wind", 'en', 'de'), "Should not match a word two characters off.")
+
+    def test_unguarded_lookup_reports_near_matches(self):
+        """
+        Tests if a lookup without the guard (ACTION = flag) still reports near matches that say something else.
+        """
+
+        memory = translation_memory.TranslationMemory()
+        memory.add("You have 3 new messages in your inbox", 'en', 'de', "Sie haben 3 neue Nachrichten in Ihrem Posteingang")
+
+        self.assertIsNone(memory.lookup("You have 5 new messages in your inbox", 'en', 'de'))
+
+        match = memory.lookup("You have 5 new messages in your inbox", 'en', 'de', guarded=False)
+        self.assertIsNotNone(match, "Should report the near match.")
+        self.assertEqual(match.source_text, "You have 3 new messages in your inbox")
+
+    def test_bounded_size(self):
+        """
+        Tests if the memory evicts the least recently used segments and cleans up their index entries.
+        """
+
+        memory = translation_memory.TranslationMemory(max_entries=100)
+        for index in range(300):
+            memory.add(f"segment number {index} with some text", 'en', 'ru', f"translation {index}")
+
+        self.assertEqual(len(memory), 100, "Should keep at most max_entries segments.")
+        self.assertEqual(memory.lookup("segment number 299 with some text", 'en', 'ru').translated_text, "translation 299")
+
+        indexed = set()
+        for bucket in memory.buckets.values():
+            indexed |= bucket if isinstance(bucket, set) else {bucket}
+        self.assertEqual(indexed, set(memory.entries), "Should not keep evicted segments in the index.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,11 @@ It uses the unittest framework to verify the text translation.
 
 import unittest
 import asyncio
+import os
+import tempfile
 
+from unittest import mock
+from src.core import glossary
 from src.core import translator
 
 class TestTranslator(unittest.TestCase):
@@ -111,5 +115,152 @@ class TestTranslator(unittest.TestCase):
         
         asyncio.run(run_test())
 
+    def test_translate_served_from_cache(self):
+        """
+        Tests if a cached translation is returned without a network request (async).
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            translator.cache.put("Кэш", 'ru', 'en', "Cache")
+            result = await translator.translate_text_detailed("Кэш", src_lang='ru', dest_lang='en')
+
+            # Assert that the translation came from the cache
+            self.assertEqual(result.text, "Cache", "Should return the cached translation.")
+            self.assertEqual(result.served_by, "cache", "Should report that the cache served the request.")
+
+        asyncio.run(run_test())
+
+    def test_cache_evicts_least_recently_used(self):
+        """
+        Tests if the translation cache stays bounded and evicts the least recently used entry.
+        """
+
+        cache = translator.TranslationCache(max_entries=2)
+        cache.put("a", 'ru', 'en', "A")
+        cache.put("b", 'ru', 'en', "B")
+        cache.get("a", 'ru', 'en')    # "a" is now the most recently used entry
+        cache.put("c", 'ru', 'en', "C")
+
+        self.assertIsNone(cache.get("b", 'ru', 'en'), "Should evict the least recently used entry.")
+        self.assertEqual(cache.get("a", 'ru', 'en'), "A")
+        self.assertEqual(cache.get("c", 'ru', 'en'), "C")
+
+    def test_translate_served_from_glossary(self):
+        """
+        Tests if a short string found in the glossary is answered without a network request (async).
+        """
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            with tempfile.TemporaryDirectory() as directory:
+                with open(os.path.join(directory, "sv-en.tsv"), "w", encoding="utf-8") as tsv_file:
+                    tsv_file.write("Inställningar\tSettings\n")
+
+                translator.glossaries.update(glossary.load_glossaries(directory))
+                try:
+                    result = await translator.translate_text_detailed("Inställningar", src_lang='sv', dest_lang='en')
+                finally:
+                    translator.glossaries.pop(('sv', 'en')).close()
+
+            # Assert that the translation came from the glossary
+            self.assertEqual(result.text, "Settings", "Should return the glossary translation.")
+            self.assertEqual(result.served_by, "glossary", "Should report that the glossary served the request.")
+
+        asyncio.run(run_test())
+
+    def test_translate_without_source_language_detects_it(self):
+        """
+        Tests if a missing source language is sent to googletrans as 'auto' (async).
+        """
+
+        requested = []
+
+        class FakeTranslator:
+            """
+            Stands in for googletrans.Translator and records the requested languages.
+            """
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            async def translate(self, text, src, dest):
+                requested.append((src, dest))
+                return mock.Mock(text="Detected")
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            # A fresh breaker: the network tests above may have opened the shared one
+            with mock.patch.object(translator, 'Translator', FakeTranslator), \
+                 mock.patch.object(translator, 'circuit_breaker', translator.resilience.CircuitBreaker()):
+                return await translator.translate_text_detailed("Текст без указанного языка", src_lang=None, dest_lang='en')
+
+        result = asyncio.run(run_test())
+
+        self.assertEqual(result.text, "Detected")
+        self.assertEqual(requested, [('auto', 'en')], "Should ask googletrans to detect the language.")
+
+    def test_glossary_fallback_keeps_the_deadline(self):
+        """
+        Tests if translating again without glossary placeholders only gets the time left of the request deadline (async).
+        """
+
+        requested = []
+
+        class SlowTranslator:
+            """
+            Stands in for googletrans.Translator: answers slowly and drops the glossary placeholders.
+            """
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            async def translate(self, text, src, dest):
+                requested.append(text)
+                await asyncio.sleep(0.3)
+                return mock.Mock(text="Open the settings now")
+
+        async def run_test():
+            """
+            Asynchronous function to execute the test.
+            """
+
+            with tempfile.TemporaryDirectory() as directory:
+                with open(os.path.join(directory, "sv-en.tsv"), "w", encoding="utf-8") as tsv_file:
+                    tsv_file.write("Inställningar\tSettings\n")
+
+                translator.glossaries.update(glossary.load_glossaries(directory))
+                policy = translator.resilience.ResiliencePolicy(deadline=0.5, attempt_timeout=0.5, max_retries=0)
+                try:
+                    with mock.patch.object(translator, 'Translator', SlowTranslator), \
+                         mock.patch.object(translator, 'policy', policy), \
+                         mock.patch.object(translator, 'circuit_breaker', translator.resilience.CircuitBreaker()):
+                        started = asyncio.get_running_loop().time()
+                        result = await translator.translate_text_detailed("Öppna Inställningar för fönstret nu", src_lang='sv', dest_lang='en')
+                        return result, asyncio.get_running_loop().time() - started
+                finally:
+                    translator.glossaries.pop(('sv', 'en')).close()
+
+        result, elapsed = asyncio.run(run_test())
+
+        self.assertEqual(len(requested), 2, "Should translate again without placeholders.")
+        self.assertEqual(result.served_by, 'timeout', "The second request should run out of the remaining time.")
+        self.assertLess(elapsed, 0.7, "Both requests together should stay within the deadline.")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file